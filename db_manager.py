@@ -6,12 +6,17 @@ Gère le stockage des données de trading, portfolios, historiques
 import sqlite3
 import json
 import threading
+import time
+import atexit
 from datetime import datetime
 from typing import Dict, List, Optional
 
 class DBManager:
     """Gère la persistance SQLite"""
 
+    # Intervalle du flusher des mises à jour de prix (micro-batch executemany)
+    PRICE_FLUSH_INTERVAL = 0.2
+
     def __init__(self, db_path: str = 'bot_data.db'):
         self.db_path = db_path
         # ✅ Phase A2: Connection persistante au lieu de nouvelles connexions à chaque fois
@@ -19,8 +24,16 @@ class DBManager:
         self.lock = threading.Lock() # 🔒 Sécurité thread-safety
         self.pending_commits = []  # Pour batch commits
         self.max_batch_size = 10  # Commit tous les 10 ops
+
+        # Mises à jour de prix en attente: {position_id: (current_price, unrealized_pnl, timestamp)}
+        # Une seule transaction par flush au lieu d'un commit par tick de prix
+        self._pending_price_updates: Dict[int, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._price_flusher = None
+
         self._connect()
         self.init_db()
+        atexit.register(self.flush_price_updates)
 
     def _connect(self):
         """✅ Phase A2: Établit la connexion persistante"""
@@ -29,6 +42,9 @@ class DBManager:
             # Optimisations SQLite
             self.conn.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging (plus rapide)
             self.conn.execute("PRAGMA synchronous=NORMAL")  # Sync moins strict mais sûr
+            self.conn.execute("PRAGMA mmap_size=268435456")  # Lectures mmap (256MB), évite read(2) + copie
+            self.conn.execute("PRAGMA cache_size=-65536")  # Cache pages 64MB (négatif = KB)
+            self.conn.execute("PRAGMA temp_store=MEMORY")  # Tables temporaires en RAM
             print("✅ Connection SQLite persistante établie")
         except Exception as e:
             print(f"❌ Erreur connexion SQLite: {e}")
@@ -537,12 +553,55 @@ class DBManager:
         return [dict(row) for row in rows]
     
     def update_position_price(self, position_id: int, current_price: float, unrealized_pnl: float):
-        """Met à jour le prix et PnL d'une position"""
-        self._execute('''
-            UPDATE bot_positions
-            SET current_price = ?, unrealized_pnl = ?, last_updated = ?
-            WHERE id = ?
-        ''', (current_price, unrealized_pnl, datetime.now().isoformat(), position_id), commit=True)
+        """Met à jour le prix et PnL d'une position (coalescé, flush en arrière-plan)"""
+        with self._pending_lock:
+            # Seule la dernière valeur par position compte: on écrase l'éventuelle précédente
+            self._pending_price_updates[position_id] = (
+                current_price, unrealized_pnl, datetime.now().isoformat()
+            )
+            if self._price_flusher is None:
+                self._price_flusher = threading.Thread(target=self._price_flush_loop, daemon=True)
+                self._price_flusher.start()
+
+    def _price_flush_loop(self):
+        """Thread de fond: écrit les mises à jour de prix par micro-batch"""
+        while True:
+            time.sleep(self.PRICE_FLUSH_INTERVAL)
+            self.flush_price_updates()
+
+    def flush_price_updates(self) -> int:
+        """
+        Écrit immédiatement les mises à jour de prix en attente (un seul executemany + commit).
+        Appelé par le flusher, à l'arrêt du process et avant une fermeture de position.
+
+        Returns:
+            Nombre de positions mises à jour
+        """
+        with self._pending_lock:
+            if not self._pending_price_updates:
+                return 0
+            pending = self._pending_price_updates
+            self._pending_price_updates = {}
+
+        rows = [(price, pnl, ts, pos_id) for pos_id, (price, pnl, ts) in pending.items()]
+        try:
+            with self.lock:
+                if not self.conn:
+                    self._reconnect()
+                self.conn.executemany('''
+                    UPDATE bot_positions
+                    SET current_price = ?, unrealized_pnl = ?, last_updated = ?
+                    WHERE id = ?
+                ''', rows)
+                self.conn.commit()
+            return len(rows)
+        except Exception as e:
+            print(f"❌ Erreur flush prix positions: {e}")
+            # Remettre en file sans écraser des valeurs plus récentes
+            with self._pending_lock:
+                for pos_id, values in pending.items():
+                    self._pending_price_updates.setdefault(pos_id, values)
+            return 0
     
     def update_position_highest_price(self, position_id: int, highest_price: float):
         """Met à jour le highest_price d'une position"""
@@ -568,6 +627,8 @@ class DBManager:
             realized_pnl: PnL réalisé
             status: 'CLOSED_MANUAL', 'CLOSED_SL', 'CLOSED_TP'
         """
+        # Rendre durable le dernier prix connu avant la fermeture (SL/TP)
+        self.flush_price_updates()
         self._execute('''
             UPDATE bot_positions
             SET status = ?, realized_pnl = ?, closed_at = ?, last_updated = ?
@@ -622,7 +683,7 @@ class DBManager:
             alert_data.get('token_id'),
             float(alert_data.get('bet_amount', 0)),
             alert_data.get('bet_outcome'),
-            float(alert_data.get('outcome_odds', 0)),
+            float(alert_data['outcome_odds']) if alert_data.get('outcome_odds') is not None else None,
             json.dumps(alert_data.get('criteria_matched', [])),
             alert_data.get('trigger_details', ''),
             alert_data.get('bet_details', ''),
@@ -876,15 +937,18 @@ class DBManager:
 
     # ============ HFT MODULE METHODS ============
 
-    def save_hft_trade(self, trade_data: Dict):
-        """Sauvegarde un trade HFT"""
-        self._execute('''
+    _HFT_TRADE_INSERT = '''
             INSERT INTO hft_trades
             (signal_timestamp, execution_timestamp, source_wallet, trader_name, market_question,
              token_id, condition_id, side, signal_price, execution_price, size_usd, shares,
              latency_ms, status, order_id, error_message)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        '''
+
+    @staticmethod
+    def _hft_trade_row(trade_data: Dict) -> tuple:
+        """Convertit un trade HFT en tuple de paramètres pour l'INSERT"""
+        return (
             trade_data.get('signal_timestamp', datetime.now().isoformat()),
             trade_data.get('execution_timestamp'),
             trade_data.get('source_wallet', ''),
@@ -901,7 +965,32 @@ class DBManager:
             trade_data.get('status', 'PENDING'),
             trade_data.get('order_id', ''),
             trade_data.get('error_message', '')
-        ), commit=True)
+        )
+
+    def save_hft_trade(self, trade_data: Dict):
+        """Sauvegarde un trade HFT"""
+        self._execute(self._HFT_TRADE_INSERT, self._hft_trade_row(trade_data), commit=True)
+
+    def save_hft_trades_batch(self, trades: List[Dict]) -> int:
+        """
+        Sauvegarde plusieurs trades HFT en une seule transaction (executemany + un commit).
+
+        Returns:
+            Nombre de trades écrits
+        """
+        if not trades:
+            return 0
+        rows = [self._hft_trade_row(t) for t in trades]
+        with self.lock:
+            if not self.conn:
+                self._reconnect()
+            try:
+                self.conn.executemany(self._HFT_TRADE_INSERT, rows)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return len(rows)
 
     def get_hft_trades(self, limit: int = 100) -> List[Dict]:
         """Récupère l'historique des trades HFT"""
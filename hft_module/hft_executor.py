@@ -6,16 +6,36 @@ Exécute les ordres sans validation lourde pour minimiser la latence.
 Optimisations v3.1:
 - DB write asynchrone (fire-and-forget)
 - Ne bloque pas le retour de l'exécution
+- Un seul worker DB persistant, écritures groupées par batch
 """
 import logging
+import queue
 import threading
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("HFTExecutor")
 
 
+def compute_order_params(best_price: float, position_usd: float, price_mult: float) -> Tuple[float, float]:
+    """
+    Noyau numérique pur du sizing HFT: prix limite (slippage inclus) et nombre de shares.
+    Sans dépendance à l'état de l'exécuteur, donc testable et réutilisable tel quel.
+
+    Returns:
+        (limit_price, shares) - shares vaut 0.0 si la taille est invalide
+    """
+    limit_price = round(best_price * price_mult, 4)
+    if limit_price <= 0:
+        return limit_price, 0.0
+    shares = position_usd / limit_price
+    if shares <= 0:
+        return limit_price, 0.0
+    return limit_price, round(shares, 2)
+
+
 class HFTExecutor:
     """
     Exécuteur de trades HFT ultra-rapide.
@@ -28,6 +48,8 @@ class HFTExecutor:
 
     DEFAULT_MAX_SLIPPAGE_BPS = 50  # 0.5%
     DEFAULT_TIMEOUT_SEC = 2
+    DB_BATCH_MAX = 50  # Trades max écrits par transaction
+    TOP_OF_BOOK_TTL_SEC = 0.1  # Une rafale de signaux sur le même token = un seul fetch du carnet
 
     def __init__(self, polymarket_client=None, db_manager=None, socketio=None):
         self.polymarket_client = polymarket_client
@@ -38,18 +60,30 @@ class HFTExecutor:
         self.max_slippage_bps = self.DEFAULT_MAX_SLIPPAGE_BPS
         self.timeout_sec = self.DEFAULT_TIMEOUT_SEC
         self.enabled = True
+        self._update_slippage_mults()
 
         # Stats
         self.trades_executed = 0
         self.trades_failed = 0
         self.total_volume_usd = 0.0
 
+        # Cache top-of-book {token_id: (expire_at, best_bid, best_ask)}
+        # Partagé par les workers d'exécution: lectures/écritures sous verrou (fetch réseau hors verrou)
+        self._top_of_book: Dict[str, Tuple[float, Optional[float], Optional[float]]] = {}
+        self._top_of_book_lock = threading.Lock()
+
+        # Worker DB persistant (remplace un thread par trade)
+        self._db_queue = queue.SimpleQueue()
+        self._db_worker = threading.Thread(target=self._db_worker_loop, name='hft-db-writer', daemon=True)
+        self._db_worker.start()
+
         logger.info("HFTExecutor initialisé")
 
     def set_config(self, config: Dict):
         """Met à jour la configuration"""
         if 'max_slippage_bps' in config:
             self.max_slippage_bps = int(config['max_slippage_bps'])
+            self._update_slippage_mults()
         if 'timeout_sec' in config:
             self.timeout_sec = int(config['timeout_sec'])
         if 'enabled' in config:
@@ -57,6 +91,12 @@ class HFTExecutor:
 
         logger.info(f"HFTExecutor config: slippage={self.max_slippage_bps}bps, timeout={self.timeout_sec}s")
 
+    def _update_slippage_mults(self):
+        """Précalcule les multiplicateurs de prix limite (recalculés seulement au changement de config)"""
+        slippage = self.max_slippage_bps / 10000.0
+        self._buy_mult = 1 + slippage
+        self._sell_mult = 1 - slippage
+
     def calculate_position_size(self, signal: Dict, wallet_config: Dict) -> float:
         """
         Calcule la taille de position pour un trade HFT.
@@ -73,25 +113,44 @@ class HFTExecutor:
         return round(position_usd, 2)
 
     def get_best_price(self, token_id: str, side: str) -> Optional[float]:
-        """Récupère le meilleur prix disponible"""
+        """Récupère le meilleur prix disponible (top-of-book, cache TTL très court)"""
+        return self._best_price(token_id, side == 'BUY')
+
+    def _best_price(self, token_id: str, is_buy: bool) -> Optional[float]:
+        """Meilleur ask si achat, meilleur bid si vente (côté déjà normalisé en booléen)"""
         if not self.polymarket_client:
             return None
 
+        now = time.monotonic()
+        with self._top_of_book_lock:
+            cached = self._top_of_book.get(token_id)
+        if cached is None or cached[0] < now:
+            top = self._fetch_top_of_book(token_id)
+            if top is None:
+                return None
+            cached = (now + self.TOP_OF_BOOK_TTL_SEC, top[0], top[1])
+            with self._top_of_book_lock:
+                if len(self._top_of_book) > 256:
+                    self._top_of_book = {k: v for k, v in self._top_of_book.items() if v[0] >= now}
+                self._top_of_book[token_id] = cached
+
+        return cached[2] if is_buy else cached[1]
+
+    def _fetch_top_of_book(self, token_id: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """
+        Lit le carnet et n'en garde que le meilleur bid / meilleur ask.
+        min/max plutôt que [0]: ne dépend pas de l'ordre de tri renvoyé par le CLOB.
+        """
         try:
             order_book = self.polymarket_client.get_order_book(token_id)
             if not order_book:
                 return None
 
-            if side == 'BUY':
-                asks = order_book.get('asks', [])
-                if asks:
-                    return float(asks[0].get('price', 0))
-            else:
-                bids = order_book.get('bids', [])
-                if bids:
-                    return float(bids[0].get('price', 0))
-
-            return None
+            bids = order_book.get('bids') or []
+            asks = order_book.get('asks') or []
+            best_bid = max((float(b.get('price', 0)) for b in bids), default=None)
+            best_ask = min((float(a.get('price', 0)) for a in asks), default=None)
+            return best_bid, best_ask
 
         except Exception as e:
             logger.error(f"Erreur get_best_price: {e}")
@@ -120,11 +179,13 @@ class HFTExecutor:
                 'message': 'Client Polymarket non configuré'
             }
 
-        start_time = datetime.now()
+        # Horloge monotone haute résolution pour la latence (pas d'objet datetime sur le chemin critique)
+        start_ns = time.perf_counter_ns()
 
         try:
             token_id = signal.get('token_id', '')
             side = signal.get('side', 'BUY')
+            is_buy = side == 'BUY'  # Normalisé une seule fois à l'entrée
             signal_price = float(signal.get('price', 0))
 
             if not token_id:
@@ -134,7 +195,7 @@ class HFTExecutor:
                 }
 
             # 1. Récupérer le meilleur prix actuel
-            best_price = self.get_best_price(token_id, side)
+            best_price = self._best_price(token_id, is_buy)
 
             if not best_price or best_price <= 0:
                 # Fallback sur le prix du signal
@@ -146,19 +207,11 @@ class HFTExecutor:
                         'message': 'Prix non disponible'
                     }
 
-            # 2. Calculer le prix limite avec slippage
-            slippage_mult = self.max_slippage_bps / 10000
-
-            if side == 'BUY':
-                limit_price = best_price * (1 + slippage_mult)
-            else:
-                limit_price = best_price * (1 - slippage_mult)
-
-            limit_price = round(limit_price, 4)
-
-            # 3. Calculer la taille de position
+            # 2-3. Prix limite avec slippage (multiplicateurs précalculés) et taille de position
             position_usd = self.calculate_position_size(signal, wallet_config)
-            shares = position_usd / limit_price if limit_price > 0 else 0
+            limit_price, shares = compute_order_params(
+                best_price, position_usd, self._buy_mult if is_buy else self._sell_mult
+            )
 
             if shares <= 0:
                 return {
@@ -166,10 +219,9 @@ class HFTExecutor:
                     'message': 'Taille de position invalide'
                 }
 
-            shares = round(shares, 2)
-
             # 4. Placer l'ordre (sans validation lourde)
-            logger.info(f"HFT Order: {side} {shares} shares @ ${limit_price} (${position_usd})")
+            # Chemin critique: formatage différé (%s), rien n'est construit si le niveau est filtré
+            logger.info("HFT Order: %s %s shares @ $%s ($%s)", side, shares, limit_price, position_usd)
 
             order_result = self.polymarket_client.place_order(
                 token_id=token_id,
@@ -179,8 +231,7 @@ class HFTExecutor:
                 order_type='LIMIT'
             )
 
-            execution_time = datetime.now()
-            latency_ms = int((execution_time - start_time).total_seconds() * 1000)
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             if order_result and order_result.get('success'):
                 self.trades_executed += 1
@@ -195,7 +246,7 @@ class HFTExecutor:
                     'shares': shares,
                     'value_usd': position_usd,
                     'latency_ms': latency_ms,
-                    'timestamp': execution_time.isoformat()
+                    'timestamp': datetime.now().isoformat()
                 }
 
                 # Sauvegarder en DB
@@ -206,7 +257,7 @@ class HFTExecutor:
                 if self.socketio:
                     self.socketio.emit('hft_trade_executed', result, namespace='/')
 
-                logger.info(f"HFT Trade exécuté: {side} ${position_usd} en {latency_ms}ms")
+                logger.info("HFT Trade exécuté: %s $%s en %sms", side, position_usd, latency_ms)
 
                 return result
 
@@ -233,12 +284,23 @@ class HFTExecutor:
         Sauvegarde le trade en base de données de manière ASYNCHRONE.
         Fire-and-forget : ne bloque pas l'exécution.
         """
-        # Préparer les données avant le thread pour éviter race conditions
-        trade_data = {
-            'signal_timestamp': signal.get('timestamp', datetime.now().isoformat()),
+        # Fire-and-forget : seules les références partent en file (signal et result ne sont
+        # plus modifiés après l'exécution). Le nom du wallet est figé ici car la config est mutable.
+        self._db_queue.put((signal, result, wallet_config.get('name', '')))
+
+    @staticmethod
+    def _build_trade_data(signal: Dict, result: Dict, wallet_name: str) -> Dict:
+        """Construit la ligne hft_trades (exécuté par le worker DB, hors du chemin critique)"""
+        # Fallback: réutiliser l'horodatage d'exécution déjà formaté plutôt qu'un second isoformat()
+        signal_timestamp = signal.get('timestamp') or result.get('timestamp')
+        if signal_timestamp is None:
+            signal_timestamp = datetime.now().isoformat()
+
+        return {
+            'signal_timestamp': signal_timestamp,
             'execution_timestamp': result.get('timestamp'),
             'source_wallet': signal.get('wallet_address', ''),
-            'trader_name': signal.get('wallet_name', wallet_config.get('name', '')),
+            'trader_name': signal.get('wallet_name', wallet_name),
             'market_question': signal.get('market_question', ''),
             'token_id': result.get('token_id', ''),
             'condition_id': signal.get('condition_id', ''),
@@ -253,20 +315,38 @@ class HFTExecutor:
             'error_message': result.get('message', '') if result.get('status') != 'executed' else ''
         }
 
-        # Fire-and-forget : lancer en background sans attendre
-        threading.Thread(
-            target=self._do_save_trade,
-            args=(trade_data,),
-            daemon=True
-        ).start()
-
-    def _do_save_trade(self, trade_data: Dict):
-        """Exécute la sauvegarde DB dans un thread séparé"""
+    def _db_worker_loop(self):
+        """Worker DB: attend un trade puis vide la file pour écrire un batch en une transaction"""
+        while True:
+            batch = [self._db_queue.get()]
+            while len(batch) < self.DB_BATCH_MAX:
+                try:
+                    batch.append(self._db_queue.get_nowait())
+                except queue.Empty:
+                    break
+            trades = []
+            for item in batch:
+                try:
+                    trades.append(self._build_trade_data(*item))
+                except Exception as e:
+                    logger.error(f"Erreur préparation trade HFT: {e}")
+            if trades:
+                self._do_save_trades(trades)
+
+    def _do_save_trades(self, batch: List[Dict]):
+        """Exécute la sauvegarde DB d'un batch (fallback trade par trade si le batch échoue)"""
         try:
-            self.db_manager.save_hft_trade(trade_data)
-            logger.debug(f"Trade sauvegardé en DB: {trade_data.get('order_id', 'N/A')}")
+            self.db_manager.save_hft_trades_batch(batch)
+            logger.debug("%d trade(s) HFT sauvegardé(s) en DB", len(batch))
+            return
         except Exception as e:
-            logger.error(f"Erreur save_trade_to_db (async): {e}")
+            logger.error(f"Erreur save_trade_to_db (batch de {len(batch)}): {e}")
+
+        for trade_data in batch:
+            try:
+                self.db_manager.save_hft_trade(trade_data)
+            except Exception as e:
+                logger.error(f"Erreur save_trade_to_db (async): {e}")
 
     def get_stats(self) -> Dict:
         """Retourne les statistiques"""
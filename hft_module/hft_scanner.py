@@ -9,7 +9,11 @@ Optimisations v3.1:
 """
 import os
 import json
+import atexit
+import queue
+import tempfile
 import threading
+import time
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Callable
@@ -23,6 +27,51 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("HFTScanner")
 
 
+def _write_file_atomic(path: str, data: bytes):
+    """
+    Écrit dans un fichier temporaire unique puis os.replace: jamais de fichier tronqué
+    à la relecture, même si le Timer de debounce et un flush explicite se chevauchent.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.', prefix=f"{os.path.basename(path)}.", suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _QueuedEmitter:
+    """
+    Proxy socketio: emit() met l'événement en file et rend la main immédiatement.
+    Un thread d'émission dédié fait les socketio.emit réels, dans l'ordre,
+    hors des threads de polling et d'exécution. Les noms d'événements sont inchangés.
+    """
+
+    def __init__(self, socketio):
+        self._socketio = socketio
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='hft-emitter', daemon=True)
+        self._thread.start()
+
+    def emit(self, event: str, data, namespace: str = '/'):
+        self._queue.put((event, data, namespace))
+
+    def _run(self):
+        while True:
+            event, data, namespace = self._queue.get()
+            try:
+                self._socketio.emit(event, data, namespace=namespace)
+            except Exception as e:
+                logger.error(f"Erreur emit {event}: {e}")
+
+
 class HFTScanner:
     """
     Scanner HFT principal.
@@ -30,6 +79,7 @@ class HFTScanner:
     """
 
     CONFIG_FILE = 'hft_config.json'
+    CONFIG_SAVE_DEBOUNCE_SEC = 0.5  # Les sauvegardes rapprochées sont regroupées en une écriture
 
     DEFAULT_CONFIG = {
         'enabled': False,
@@ -42,13 +92,17 @@ class HFTScanner:
     }
 
     def __init__(self, socketio=None, db_manager=None, polymarket_client=None):
-        self.socketio = socketio
+        # Les emits partent via un thread dédié (ne bloquent ni le polling ni l'exécution)
+        self.socketio = _QueuedEmitter(socketio) if socketio else None
         self.db_manager = db_manager
         self.polymarket_client = polymarket_client
 
         # Configuration
         self.config = self.DEFAULT_CONFIG.copy()
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_timer_lock = threading.Lock()
         self.load_config()
+        atexit.register(self._flush_pending_config)
 
         # Composants
         self.market_discovery = HFTMarketDiscovery(
@@ -63,7 +117,7 @@ class HFTScanner:
         self.executor = HFTExecutor(
             polymarket_client=polymarket_client,
             db_manager=db_manager,
-            socketio=socketio
+            socketio=self.socketio
         )
         self.executor.set_config({
             'max_slippage_bps': self.config.get('max_slippage_bps', 50),
@@ -79,7 +133,12 @@ class HFTScanner:
 
         # ThreadPool pour exécution ASYNCHRONE (non-bloquante)
         self._execution_pool = ThreadPoolExecutor(max_workers=5)
+        atexit.register(self._execution_pool.shutdown, wait=False)
         self._pending_executions = 0
+        self._pending_lock = threading.Lock()  # += / -= depuis plusieurs workers: pas atomique
+
+        # Index {adresse en minuscules: config wallet} pour un lookup O(1) par signal
+        self._wallet_index: Dict[str, Dict] = {}
 
         # Charger les wallets
         self._load_wallets()
@@ -93,16 +152,27 @@ class HFTScanner:
         logger.info("HFTScanner initialisé (exécution asynchrone activée)")
 
     def _load_wallets(self):
-        """Charge les wallets depuis la config"""
+        """Charge les wallets depuis la config (adresses canonicalisées une fois au démarrage)"""
         wallets = self.config.get('tracked_wallets', [])
+        for wallet in wallets:
+            wallet['address'] = wallet.get('address', '').lower()
+        self._rebuild_wallet_index()
+
         for wallet in wallets:
             if wallet.get('enabled', True):
                 self.trade_monitor.add_wallet(
-                    address=wallet.get('address', ''),
+                    address=wallet['address'],
                     name=wallet.get('nickname', 'HFT Wallet'),
                     config=wallet
                 )
 
+    def _rebuild_wallet_index(self):
+        """Reconstruit l'index des wallets à partir de la config"""
+        self._wallet_index = {
+            w['address']: w
+            for w in self.config.get('tracked_wallets', [])
+        }
+
     def load_config(self):
         """Charge la configuration depuis le fichier"""
         try:
@@ -117,10 +187,29 @@ class HFTScanner:
             logger.error(f"Erreur chargement config HFT: {e}")
 
     def save_config(self):
-        """Sauvegarde la configuration"""
+        """Programme la sauvegarde de la configuration (debounce: une rafale = une écriture)"""
+        with self._save_timer_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.CONFIG_SAVE_DEBOUNCE_SEC, self.flush_config)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_pending_config(self):
+        """À l'arrêt du process: n'écrit que si une sauvegarde était programmée"""
+        if self._save_timer is not None:
+            self.flush_config()
+
+    def flush_config(self):
+        """Écrit immédiatement la configuration sur disque (annule la sauvegarde programmée)"""
+        with self._save_timer_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
         try:
-            with open(self.CONFIG_FILE, 'w') as f:
-                json.dump(self.config, f, indent=4)
+            with self._lock:
+                data = json.dumps(self.config, indent=4).encode('utf-8')
+            _write_file_atomic(self.CONFIG_FILE, data)
             logger.info("Configuration HFT sauvegardée")
         except Exception as e:
             logger.error(f"Erreur sauvegarde config HFT: {e}")
@@ -142,6 +231,11 @@ class HFTScanner:
             if 'max_slippage_bps' in new_config or 'execution_timeout_sec' in new_config:
                 self.executor.set_config(new_config)
 
+            if 'tracked_wallets' in new_config:
+                for wallet in self.config.get('tracked_wallets', []):
+                    wallet['address'] = wallet.get('address', '').lower()
+                self._rebuild_wallet_index()
+
             self.save_config()
 
     def get_config(self) -> Dict:
@@ -156,15 +250,13 @@ class HFTScanner:
         Callback NON-BLOQUANT appelé quand un signal HFT est détecté.
         L'exécution est déléguée au ThreadPool pour ne pas bloquer le polling.
         """
-        self.signals_received += 1
-
-        logger.info(f"⚡ HFT Signal reçu: {signal.wallet_name} | {signal.side} | ${signal.value_usd:.2f}")
+        # Scanner arrêté: les signaux encore en file chez le trade monitor ne déclenchent rien
+        if not self._running:
+            return
 
-        # Notifier l'UI immédiatement (non-bloquant)
-        if self.socketio:
-            self.socketio.emit('hft_signal', signal.to_dict(), namespace='/')
+        self.signals_received += 1
 
-        # Vérifications rapides (in-memory, non-bloquant)
+        # Vérifications rapides (in-memory) AVANT tout I/O: rien n'est émis si le signal est ignoré
         if not self.config.get('enabled', False):
             logger.debug("HFT désactivé, signal ignoré")
             return
@@ -175,17 +267,26 @@ class HFTScanner:
             return
 
         if not wallet_config.get('enabled', True):
-            logger.debug(f"Wallet {signal.wallet_name} désactivé")
+            logger.debug("Wallet %s désactivé", signal.wallet_name)
             return
 
         # EXÉCUTION ASYNCHRONE - Ne bloque PAS le thread de polling !
-        self._pending_executions += 1
+        with self._pending_lock:
+            self._pending_executions += 1
         self._execution_pool.submit(
             self._execute_trade_async,
             signal,
             wallet_config
         )
-        logger.debug(f"Trade soumis au pool d'exécution (pending: {self._pending_executions})")
+
+        # Chemin critique: formatage différé (%s), rien n'est construit si le niveau est filtré
+        logger.info("⚡ HFT Signal reçu: %s | %s | $%.2f", signal.wallet_name, signal.side, signal.value_usd)
+
+        # Notifier l'UI (non-bloquant, l'exécution est déjà partie)
+        if self.socketio:
+            self.socketio.emit('hft_signal', signal.to_dict(), namespace='/')
+
+        logger.debug("Trade soumis au pool d'exécution (pending: %d)", self._pending_executions)
 
     def _execute_trade_async(self, signal: HFTSignal, wallet_config: Dict):
         """
@@ -193,11 +294,18 @@ class HFTScanner:
         Ne bloque pas le polling - le scanner continue à détecter pendant l'exécution.
         """
         try:
+            # Arrêt demandé pendant que le trade attendait un worker: aucun ordre envoyé
+            if not self._running:
+                logger.info("Scanner HFT arrêté, trade %s annulé avant envoi", signal.wallet_name)
+                return
+
             result = self.executor.execute_copy_trade(signal.to_dict(), wallet_config)
 
             if result.get('status') == 'executed':
                 self.signals_executed += 1
-                logger.info(f"✅ HFT Trade exécuté: ${result.get('value_usd', 0):.2f} (latency: {result.get('latency_ms', 0)}ms)")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("✅ HFT Trade exécuté: $%.2f (latency: %sms)",
+                                result.get('value_usd', 0), result.get('latency_ms', 0))
             else:
                 self.signals_failed += 1
                 logger.warning(f"❌ HFT Trade échoué: {result.get('message', 'Unknown')}")
@@ -207,15 +315,12 @@ class HFTScanner:
             logger.error(f"❌ Erreur exécution HFT: {e}")
 
         finally:
-            self._pending_executions -= 1
+            with self._pending_lock:
+                self._pending_executions -= 1
 
     def _get_wallet_config(self, address: str) -> Optional[Dict]:
         """Récupère la configuration d'un wallet"""
-        addr = address.lower()
-        for wallet in self.config.get('tracked_wallets', []):
-            if wallet.get('address', '').lower() == addr:
-                return wallet
-        return None
+        return self._wallet_index.get(address.lower())
 
     # =========================================================================
     # GESTION DES WALLETS
@@ -226,9 +331,8 @@ class HFTScanner:
         addr = address.lower()
 
         # Vérifier si déjà présent
-        for w in self.config.get('tracked_wallets', []):
-            if w.get('address', '').lower() == addr:
-                return {'success': False, 'message': 'Wallet déjà suivi'}
+        if addr in self._wallet_index:
+            return {'success': False, 'message': 'Wallet déjà suivi'}
 
         wallet_config = {
             'address': addr,
@@ -241,6 +345,7 @@ class HFTScanner:
         }
 
         self.config['tracked_wallets'].append(wallet_config)
+        self._wallet_index[addr] = wallet_config
         self.save_config()
 
         # Ajouter au monitor
@@ -255,12 +360,13 @@ class HFTScanner:
         addr = address.lower()
 
         wallets = self.config.get('tracked_wallets', [])
-        new_wallets = [w for w in wallets if w.get('address', '').lower() != addr]
+        new_wallets = [w for w in wallets if w['address'] != addr]
 
         if len(new_wallets) == len(wallets):
             return {'success': False, 'message': 'Wallet non trouvé'}
 
         self.config['tracked_wallets'] = new_wallets
+        self._wallet_index.pop(addr, None)
         self.save_config()
 
         # Retirer du monitor
@@ -274,18 +380,18 @@ class HFTScanner:
         """Met à jour la configuration d'un wallet"""
         addr = address.lower()
 
-        for wallet in self.config.get('tracked_wallets', []):
-            if wallet.get('address', '').lower() == addr:
-                for key, value in updates.items():
-                    if key != 'address':  # Ne pas modifier l'adresse
-                        wallet[key] = value
+        wallet = self._wallet_index.get(addr)
+        if wallet is None:
+            return {'success': False, 'message': 'Wallet non trouvé'}
 
-                self.save_config()
-                logger.info(f"Wallet HFT mis à jour: {addr[:10]}...")
+        for key, value in updates.items():
+            if key != 'address':  # Ne pas modifier l'adresse
+                wallet[key] = value
 
-                return {'success': True, 'wallet': wallet}
+        self.save_config()
+        logger.info(f"Wallet HFT mis à jour: {addr[:10]}...")
 
-        return {'success': False, 'message': 'Wallet non trouvé'}
+        return {'success': True, 'wallet': wallet}
 
     def get_wallets(self) -> List[Dict]:
         """Retourne la liste des wallets HFT"""
@@ -308,8 +414,8 @@ class HFTScanner:
         self.market_discovery.start()
         self.trade_monitor.start()
 
+        # État runtime uniquement: pas d'écriture disque sur le chemin start/stop
         self.config['enabled'] = True
-        self.save_config()
 
         logger.info("Scanner HFT démarré")
 
@@ -319,21 +425,23 @@ class HFTScanner:
 
     def stop(self):
         """Arrête le scanner HFT"""
+        # Plus aucune soumission ni envoi d'ordre à partir d'ici (voir _on_signal_detected)
         self._running = False
+        # État runtime uniquement: pas d'écriture disque sur le chemin start/stop
+        self.config['enabled'] = False
 
         # Arrêter les composants
         self.market_discovery.stop()
         self.trade_monitor.stop()
 
-        # Attendre les exécutions en cours (max 5s)
+        # Attendre les ordres déjà envoyés (max 5s); ceux encore en file s'annulent d'eux-mêmes.
+        # Le pool est conservé (threads déjà chauds pour le prochain démarrage), il n'est arrêté
+        # qu'à la sortie du process.
         if self._pending_executions > 0:
             logger.info(f"Attente de {self._pending_executions} exécution(s) en cours...")
-            self._execution_pool.shutdown(wait=True, cancel_futures=False)
-            # Recréer le pool pour les prochains démarrages
-            self._execution_pool = ThreadPoolExecutor(max_workers=5)
-
-        self.config['enabled'] = False
-        self.save_config()
+            deadline = time.monotonic() + 5
+            while self._pending_executions > 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
 
         logger.info("Scanner HFT arrêté")
 
@@ -60,9 +60,16 @@ class HFTMarketDiscovery:
 
     GAMMA_API = "https://gamma-api.polymarket.com"
 
-    # Keywords pour identifier les marchés crypto
-    CRYPTO_KEYWORDS = ['btc', 'eth', 'bitcoin', 'ethereum', 'crypto']
-    DIRECTION_KEYWORDS = ['up', 'down', 'above', 'below', 'higher', 'lower', 'rise', 'fall']
+    # Keywords pour identifier les marchés crypto, avec leur classification
+    # précalculée (l'ordre définit la priorité du premier match)
+    CRYPTO_KEYWORDS = (
+        ('btc', 'BTC'), ('eth', 'ETH'), ('bitcoin', 'BTC'),
+        ('ethereum', 'ETH'), ('crypto', 'CRYPTO')
+    )
+    DIRECTION_KEYWORDS = (
+        ('up', 'UP'), ('down', 'DOWN'), ('above', 'UP'), ('below', 'DOWN'),
+        ('higher', 'UP'), ('lower', 'DOWN'), ('rise', 'UP'), ('fall', 'DOWN')
+    )
 
     # Durée acceptable pour un marché 15-min (en minutes)
     MIN_DURATION_MINUTES = 10
@@ -93,14 +100,9 @@ class HFTMarketDiscovery:
 
         # 1. Vérifier les keywords crypto
         crypto_asset = None
-        for kw in self.CRYPTO_KEYWORDS:
+        for kw, asset in self.CRYPTO_KEYWORDS:
             if kw in question:
-                if 'btc' in kw or 'bitcoin' in kw:
-                    crypto_asset = 'BTC'
-                elif 'eth' in kw or 'ethereum' in kw:
-                    crypto_asset = 'ETH'
-                else:
-                    crypto_asset = 'CRYPTO'
+                crypto_asset = asset
                 break
 
         if not crypto_asset:
@@ -108,12 +110,9 @@ class HFTMarketDiscovery:
 
         # 2. Vérifier les keywords de direction
         direction = None
-        for kw in self.DIRECTION_KEYWORDS:
+        for kw, label in self.DIRECTION_KEYWORDS:
             if kw in question:
-                if kw in ['up', 'above', 'higher', 'rise']:
-                    direction = 'UP'
-                else:
-                    direction = 'DOWN'
+                direction = label
                 break
 
         if not direction:
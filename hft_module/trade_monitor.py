@@ -10,18 +10,30 @@ Optimisations v3.2:
 - Cache Gamma API avec TTL 30s
 - Pré-chargement positions au démarrage
 - Rate limiter partagé avec InsiderScanner (évite conflits 429)
+- Session HTTP keep-alive partagée (pas de handshake TLS par requête)
 """
 import os
 import sys
+import json
 import threading
+import queue
 import time
+import random
 import logging
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from typing import Dict, List, Set, Optional, Callable, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
-from collections import deque
+from dataclasses import dataclass
+from collections import deque, OrderedDict
+
+# Parser JSON rapide (optionnel, fallback sur json standard)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Ajouter le parent au path pour importer goldsky_rate_limiter
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -30,6 +42,13 @@ from goldsky_rate_limiter import get_goldsky_rate_limiter, Priority
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("HFTTradeMonitor")
 
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 
 @dataclass
 class HFTSignal:
@@ -51,9 +70,23 @@ class HFTSignal:
     latency_ms: int     # Temps entre trade on-chain et détection
 
     def to_dict(self) -> Dict:
+        # Dict explicite: asdict() copie récursivement chaque champ
         return {
-            **asdict(self),
-            'timestamp': self.timestamp.isoformat()
+            'id': self.id,
+            'wallet_address': self.wallet_address,
+            'wallet_name': self.wallet_name,
+            'token_id': self.token_id,
+            'condition_id': self.condition_id,
+            'side': self.side,
+            'price': self.price,
+            'size': self.size,
+            'value_usd': self.value_usd,
+            'market_question': self.market_question,
+            'crypto_asset': self.crypto_asset,
+            'direction': self.direction,
+            'tx_hash': self.tx_hash,
+            'timestamp': self.timestamp.isoformat(),
+            'latency_ms': self.latency_ms,
         }
 
 
@@ -67,6 +100,29 @@ class HFTTradeMonitor:
     GOLDSKY_POSITIONS = "https://api.goldsky.com/api/public/project_cl6mb8i9h0003e201j6li0diw/subgraphs/positions-subgraph/0.0.7/gn"
     GAMMA_API = "https://gamma-api.polymarket.com"
 
+    # Nombre de wallets regroupés par requête GraphQL (un alias par wallet)
+    POSITIONS_BATCH_SIZE = 25
+    # Nombre de token_ids par requête Gamma groupée (limite la longueur d'URL)
+    MARKETS_BATCH_SIZE = 50
+    # Taille max du cache Gamma (LRU + TTL, mémoire bornée sur les longues sessions)
+    MARKET_CACHE_MAX = 10_000
+    # Workers du pool persistant (aligné sur pool_maxsize de la session HTTP)
+    POLL_WORKERS = 10
+    # Backoff du polling en période calme: intervalle doublé tous les QUIET_POLLS_STEP polls sans signal
+    POLL_INTERVAL_MAX = 10
+    QUIET_POLLS_STEP = 5
+    POLL_JITTER_SEC = 0.1
+    # Attente max de la boucle précédente au redémarrage (un poll: requête groupée + détection)
+    STOP_JOIN_TIMEOUT_SEC = 15
+    _BALANCES_FIELDS = "id balance asset { id condition { id } }"
+    # Requêtes à texte fixe + variables (plan de requête réutilisable côté subgraph)
+    _POSITIONS_QUERY = (
+        'query Positions($user: String!) { '
+        'userBalances(first: 100, where: {user: $user, balance_gt: "0"}) '
+        '{ ' + _BALANCES_FIELDS + ' } }'
+    )
+    _batch_queries: Dict[int, str] = {}  # {taille du lot: requête aliasée}
+
     def __init__(self, market_discovery=None):
         self.market_discovery = market_discovery
         self.tracked_wallets: Dict[str, Dict] = {}  # {address: config}
@@ -75,17 +131,22 @@ class HFTTradeMonitor:
         # État
         self._running = False
         self._poll_thread = None
+        self._stop_event = threading.Event()  # Un Event par démarrage: stop() réveille la boucle en attente
         self._poll_interval = 2  # 2 secondes - optimisé pour HFT (était 5s)
+        self._current_interval = self._poll_interval  # Intervalle effectif (adaptatif)
+        self._quiet_polls = 0
 
         # Cache positions précédentes pour détecter les changements
         self._last_positions: Dict[str, Dict] = {}  # {wallet: {asset_id: balance}}
 
         # Cache pour éviter les doublons de signaux
-        self._processed_signals: Set[str] = set()
+        self._processed_signals: OrderedDict = OrderedDict()  # LRU des signal_id déjà émis
         self._max_cache_size = 500
 
         # Cache Gamma API avec TTL (optimisation latence)
-        self._market_cache: Dict[str, Tuple[Dict, float]] = {}  # {token_id: (data, timestamp)}
+        self._market_cache: OrderedDict = OrderedDict()  # {token_id: (data, horloge monotone)}, du plus ancien au plus récent
+        self._market_cache_lock = threading.Lock()
+        self._market_inflight: Dict[str, Future] = {}  # Requêtes Gamma en cours (coalescing par token_id)
         self._cache_ttl = 30  # 30 secondes TTL
 
         # Buffer de signaux récents
@@ -98,8 +159,15 @@ class HFTTradeMonitor:
         self.cache_hits = 0
         self.cache_misses = 0
 
-        # ThreadPool pour polling parallèle
-        self._executor: Optional[ThreadPoolExecutor] = None
+        # File des signaux vers les callbacks (un callback lent ne bloque plus le polling)
+        self._callback_queue = queue.SimpleQueue()
+        self._callback_worker = threading.Thread(target=self._callback_worker_loop, name='hft-callbacks', daemon=True)
+        self._callback_worker.start()
+
+        # Session HTTP partagée par les workers (keep-alive Goldsky + Gamma)
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=self.POLL_WORKERS, max_retries=0))
+        self._session.headers.update({'Content-Type': 'application/json'})
 
         logger.info("HFTTradeMonitor initialisé (Goldsky + Gamma, polling 2s, parallèle)")
 
@@ -108,6 +176,7 @@ class HFTTradeMonitor:
         addr = address.lower()
         self.tracked_wallets[addr] = {
             'address': addr,
+            'short': addr[:10],  # Forme courte pour les logs, calculée une fois
             'name': name,
             'config': config or {},
             'added_at': datetime.now().isoformat()
@@ -129,6 +198,11 @@ class HFTTradeMonitor:
         """Ajoute un callback appelé lors de la détection d'un signal"""
         self.callbacks.append(callback)
 
+    def _callback_worker_loop(self):
+        """Worker callbacks: dépile les signaux détectés et les notifie hors du thread de polling"""
+        while True:
+            self._notify_callbacks(self._callback_queue.get())
+
     def _notify_callbacks(self, signal: HFTSignal):
         """Notifie tous les callbacks"""
         for callback in self.callbacks:
@@ -143,36 +217,20 @@ class HFTTradeMonitor:
 
     def _get_user_positions(self, address: str) -> Dict[str, float]:
         """Récupère les positions actuelles d'un wallet via Goldsky"""
-        query = """
-        {
-          userBalances(first: 100, where: {user: "%s", balance_gt: "0"}) {
-            id
-            balance
-            asset {
-              id
-              condition {
-                id
-              }
-            }
-          }
-        }
-        """ % address.lower()
-
         try:
             # Rate limiter avec priorité HFT (plus haute que Insider)
             rate_limiter = get_goldsky_rate_limiter()
             rate_limiter.wait_for_slot(Priority.HFT)
 
-            resp = requests.post(
+            resp = self._session.post(
                 self.GOLDSKY_POSITIONS,
-                json={'query': query},
-                timeout=3,  # Réduit de 10s à 3s pour HFT
-                headers={'Content-Type': 'application/json'}
+                data=_json_dumps({'query': self._POSITIONS_QUERY, 'variables': {'user': address.lower()}}),
+                timeout=3  # Réduit de 10s à 3s pour HFT
             )
 
             if resp.status_code == 200:
                 rate_limiter.report_success()
-                data = resp.json()
+                data = _json_loads(resp.content)
                 if 'data' in data and data['data'].get('userBalances'):
                     positions = {}
                     for bal in data['data']['userBalances']:
@@ -188,71 +246,229 @@ class HFTTradeMonitor:
             logger.debug(f"Erreur get_user_positions: {e}")
             return {}
 
+    @classmethod
+    def _batch_query(cls, size: int) -> str:
+        """Requête aliasée (w0..wN, variables $u0..$uN) pour un lot de `size` wallets, construite une fois par taille"""
+        query = cls._batch_queries.get(size)
+        if query is None:
+            params = ", ".join(f"$u{i}: String!" for i in range(size))
+            aliases = " ".join(
+                f'w{i}: userBalances(first: 100, where: {{user: $u{i}, balance_gt: "0"}}) '
+                f'{{ {cls._BALANCES_FIELDS} }}'
+                for i in range(size)
+            )
+            query = cls._batch_queries[size] = f"query Batch({params}) {{ {aliases} }}"
+        return query
+
+    def _get_positions_batch(self, addresses: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Récupère les positions de plusieurs wallets en une requête GraphQL par lot
+        (un alias userBalances par wallet). Un wallet absent du résultat = échec de
+        récupération (à ne pas confondre avec un wallet sans position, qui vaut {}).
+        Les adresses sont les clés de tracked_wallets, déjà en minuscules (add_wallet).
+        """
+        results: Dict[str, Dict[str, float]] = {}
+        rate_limiter = get_goldsky_rate_limiter()
+
+        for start in range(0, len(addresses), self.POSITIONS_BATCH_SIZE):
+            chunk = addresses[start:start + self.POSITIONS_BATCH_SIZE]
+            payload = {
+                'query': self._batch_query(len(chunk)),
+                'variables': {f'u{i}': addr for i, addr in enumerate(chunk)},
+            }
+
+            try:
+                rate_limiter.wait_for_slot(Priority.HFT)
+                resp = self._session.post(self.GOLDSKY_POSITIONS, data=_json_dumps(payload), timeout=3)
+
+                if resp.status_code == 429:
+                    rate_limiter.report_rate_limit()
+                    continue
+                if resp.status_code != 200:
+                    continue
+
+                rate_limiter.report_success()
+                data = _json_loads(resp.content).get('data') or {}
+                for i, addr in enumerate(chunk):
+                    balances = data.get(f'w{i}')
+                    if balances is None:
+                        continue
+                    results[addr] = {
+                        bal['asset']['id']: float(bal['balance']) / 1e6
+                        for bal in balances
+                    }
+            except Exception as e:
+                logger.debug(f"Erreur get_positions_batch: {e}")
+
+        return results
+
     # =========================================================================
     # GAMMA API - Infos marché
     # =========================================================================
 
     def _get_market_info(self, token_id: str) -> Dict:
         """Récupère les infos d'un marché via Gamma API (avec cache TTL 30s)"""
-        now = time.time()
+        now = time.monotonic()
 
         # Vérifier le cache
-        if token_id in self._market_cache:
-            cached_data, cached_time = self._market_cache[token_id]
-            if now - cached_time < self._cache_ttl:
-                self.cache_hits += 1
-                return cached_data
+        cached_data = self._cache_get(token_id, now)
+        if cached_data is not None:
+            self.cache_hits += 1
+            return cached_data
 
         self.cache_misses += 1
 
+        # Coalescing: un seul appel Gamma par token_id, les appelants concurrents attendent son résultat
+        with self._market_cache_lock:
+            future = self._market_inflight.get(token_id)
+            owner = future is None
+            if owner:
+                future = self._market_inflight[token_id] = Future()
+
+        if not owner:
+            try:
+                return future.result(timeout=5)
+            except Exception:
+                return {}
+
+        result = {}
+        try:
+            result = self._fetch_market_info(token_id, now)
+        finally:
+            with self._market_cache_lock:
+                self._market_inflight.pop(token_id, None)
+            future.set_result(result)
+        return result
+
+    def _fetch_market_info(self, token_id: str, now: float) -> Dict:
+        """Appel Gamma unitaire pour un token_id (résultat mis en cache)"""
         try:
-            resp = requests.get(
+            resp = self._session.get(
                 f"{self.GAMMA_API}/markets",
                 params={'clob_token_ids': token_id},
                 timeout=3  # Réduit de 5s à 3s
             )
             if resp.status_code == 200:
-                markets = resp.json()
+                markets = _json_loads(resp.content)
                 if markets and len(markets) > 0:
-                    market = markets[0]
-                    result = {
-                        'question': market.get('question', ''),
-                        'condition_id': market.get('condition_id', ''),
-                        'yes_price': float(market.get('outcomePrices', '["0.5","0.5"]').strip('[]').split(',')[0].strip('"') or 0.5),
-                    }
+                    result = self._market_result(markets[0])
                     # Stocker en cache
-                    self._market_cache[token_id] = (result, now)
+                    self._cache_put(token_id, result, now)
                     return result
         except Exception as e:
             logger.debug(f"Erreur get_market_info: {e}")
 
         return {}
 
+    def _cache_get(self, token_id: str, now: float) -> Optional[Dict]:
+        """Lecture du cache Gamma, None si absent ou expiré"""
+        with self._market_cache_lock:
+            entry = self._market_cache.get(token_id)
+            if entry is None or now - entry[1] >= self._cache_ttl:
+                return None
+            return entry[0]
+
+    def _cache_put(self, token_id: str, data: Dict, now: float) -> None:
+        """
+        Écriture dans le cache Gamma. Les entrées sont rangées par date d'écriture:
+        les expirées et l'excédent au-delà de MARKET_CACHE_MAX sont retirés en tête.
+        """
+        with self._market_cache_lock:
+            cache = self._market_cache
+            cache[token_id] = (data, now)
+            cache.move_to_end(token_id)
+            while cache:
+                oldest_time = next(iter(cache.values()))[1]
+                if len(cache) <= self.MARKET_CACHE_MAX and now - oldest_time < self._cache_ttl:
+                    break
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _market_result(market: Dict) -> Dict:
+        """Extrait les champs utiles d'un marché Gamma"""
+        yes_price = 0.5
+        prices = market.get('outcomePrices')
+        try:
+            if isinstance(prices, str):
+                prices = _json_loads(prices)
+            if prices:
+                yes_price = float(prices[0])
+        except (ValueError, TypeError):
+            pass
+
+        return {
+            'question': market.get('question', ''),
+            'condition_id': market.get('condition_id', ''),
+            'yes_price': yes_price,
+        }
+
+    def _prefetch_market_info(self, token_ids) -> None:
+        """
+        Réchauffe le cache Gamma en bloc: une requête par lot de token_ids inconnus ou expirés,
+        pour que la détection des changements ne fasse plus d'appel réseau par asset.
+        """
+        now = time.monotonic()
+        missing = [tid for tid in token_ids if self._cache_get(tid, now) is None]
+
+        for start in range(0, len(missing), self.MARKETS_BATCH_SIZE):
+            chunk = missing[start:start + self.MARKETS_BATCH_SIZE]
+            wanted = set(chunk)
+            try:
+                resp = self._session.get(
+                    f"{self.GAMMA_API}/markets",
+                    params={'clob_token_ids': chunk},
+                    timeout=3
+                )
+                if resp.status_code != 200:
+                    continue
+                for market in _json_loads(resp.content) or []:
+                    token_list = market.get('clobTokenIds') or '[]'
+                    if isinstance(token_list, str):
+                        token_list = _json_loads(token_list)
+                    result = self._market_result(market)
+                    for tid in wanted.intersection(token_list):
+                        self._cache_put(tid, result, now)
+            except Exception as e:
+                logger.debug(f"Erreur prefetch_market_info: {e}")
+
     # =========================================================================
     # DÉTECTION DE TRADES
     # =========================================================================
 
-    def _detect_position_changes(self, wallet_addr: str, wallet_info: Dict) -> List[HFTSignal]:
-        """Détecte les changements de position pour un wallet"""
+    @staticmethod
+    def _changed_assets(current_positions: Dict[str, float],
+                        previous_positions: Dict[str, float]) -> List[Tuple[str, float]]:
+        """Liste des (asset_id, diff) dont le solde a bougé d'au moins 1 (seuil minimum $1)"""
+        # Cas courant entre deux trades: comparaison C des dicts, pas de boucle par asset
+        if current_positions == previous_positions:
+            return []
+
+        changes = []
+        for asset_id in current_positions.keys() | previous_positions.keys():
+            diff = current_positions.get(asset_id, 0) - previous_positions.get(asset_id, 0)
+            if abs(diff) >= 1:
+                changes.append((asset_id, diff))
+        return changes
+
+    def _detect_position_changes(self, wallet_addr: str, wallet_info: Dict,
+                                 current_positions: Optional[Dict[str, float]] = None) -> List[HFTSignal]:
+        """Détecte les changements de position pour un wallet (positions pré-chargées si fournies)"""
         signals = []
         detection_time = datetime.now()
 
-        # Récupérer positions actuelles
-        current_positions = self._get_user_positions(wallet_addr)
+        # Récupérer positions actuelles; positions fournies = poll groupé, qui a déjà pré-chargé
+        # les marchés modifiés de tous les wallets
+        standalone = current_positions is None
+        if standalone:
+            current_positions = self._get_user_positions(wallet_addr)
         previous_positions = self._last_positions.get(wallet_addr, {})
 
-        # Détecter les changements
-        all_assets = set(current_positions.keys()) | set(previous_positions.keys())
-
-        for asset_id in all_assets:
-            current_bal = current_positions.get(asset_id, 0)
-            previous_bal = previous_positions.get(asset_id, 0)
-            diff = current_bal - previous_bal
-
-            # Seuil minimum de changement ($1)
-            if abs(diff) < 1:
-                continue
+        # Détecter les changements, puis (hors poll groupé) un seul appel Gamma pour les marchés non cachés
+        changes = self._changed_assets(current_positions, previous_positions)
+        if changes and standalone:
+            self._prefetch_market_info([asset_id for asset_id, _ in changes])
 
+        for asset_id, diff in changes:
             # Créer un ID unique pour éviter les doublons
             signal_id = f"{wallet_addr[:8]}_{asset_id[:16]}_{int(detection_time.timestamp())}"
             if signal_id in self._processed_signals:
@@ -301,11 +517,11 @@ class HFTTradeMonitor:
             )
 
             signals.append(signal)
-            self._processed_signals.add(signal_id)
+            self._processed_signals[signal_id] = None
 
-            # Nettoyer le cache si trop grand
-            if len(self._processed_signals) > self._max_cache_size:
-                self._processed_signals = set(list(self._processed_signals)[-250:])
+            # Nettoyer le cache si trop grand (éviction des plus anciens, O(1))
+            while len(self._processed_signals) > self._max_cache_size:
+                self._processed_signals.popitem(last=False)
 
         # Mettre à jour le cache
         self._last_positions[wallet_addr] = current_positions
@@ -316,95 +532,133 @@ class HFTTradeMonitor:
     # POLLING LOOP (PARALLÈLE)
     # =========================================================================
 
-    def _poll_all_wallets_parallel(self) -> List[HFTSignal]:
-        """Poll tous les wallets en parallèle pour réduire la latence"""
+    def _poll_all_wallets_batched(self, executor: ThreadPoolExecutor) -> List[HFTSignal]:
+        """
+        Poll tous les wallets: positions en une requête GraphQL groupée (1 RTT au lieu de N),
+        puis détection des changements en parallèle (lookups Gamma) sur le pool de la boucle.
+        """
         all_signals = []
 
         if not self.tracked_wallets:
             return all_signals
 
-        # Utiliser ThreadPoolExecutor pour polling parallèle
-        with ThreadPoolExecutor(max_workers=min(10, len(self.tracked_wallets) + 1)) as executor:
-            futures = {
-                executor.submit(self._detect_position_changes, addr, info): addr
-                for addr, info in self.tracked_wallets.items()
-            }
+        wallets = dict(self.tracked_wallets)
+        positions = self._get_positions_batch(list(wallets))
+        # Les wallets en échec sont ignorés ce cycle (pas de faux signaux SELL)
+        wallets = {addr: info for addr, info in wallets.items() if addr in positions}
+        if not wallets:
+            return all_signals
 
-            for future in as_completed(futures, timeout=self._poll_interval + 3):
-                try:
-                    signals = future.result()
-                    all_signals.extend(signals)
-                except Exception as e:
-                    wallet_addr = futures[future]
-                    logger.debug(f"Erreur polling {wallet_addr[:10]}...: {e}")
+        # Un appel Gamma groupé pour les assets modifiés non cachés, tous wallets confondus
+        changed = {
+            asset_id
+            for addr in wallets
+            for asset_id, _ in self._changed_assets(positions[addr], self._last_positions.get(addr, {}))
+        }
+        if changed:
+            self._prefetch_market_info(changed)
+
+        futures = {
+            executor.submit(self._detect_position_changes, addr, info, positions[addr]): info
+            for addr, info in wallets.items()
+        }
+
+        for future in as_completed(futures, timeout=self._poll_interval + 3):
+            try:
+                signals = future.result()
+                all_signals.extend(signals)
+            except Exception as e:
+                logger.debug("Erreur polling %s...: %s", futures[future].get('short'), e)
 
         return all_signals
 
-    def _poll_loop(self):
-        """Boucle de polling principale (optimisée avec parallélisation)"""
+    def _update_poll_interval(self, had_signals: bool):
+        """
+        Intervalle adaptatif: retour à l'intervalle configuré dès qu'un signal est détecté,
+        doublement progressif (jusqu'à POLL_INTERVAL_MAX) après des polls sans activité.
+        """
+        if had_signals:
+            self._quiet_polls = 0
+            self._current_interval = self._poll_interval
+            return
+
+        self._quiet_polls += 1
+        factor = 1 << min(3, self._quiet_polls // self.QUIET_POLLS_STEP)
+        self._current_interval = min(max(self.POLL_INTERVAL_MAX, self._poll_interval), self._poll_interval * factor)
+
+    def _poll_loop(self, stop_event: threading.Event, executor: ThreadPoolExecutor):
+        """
+        Boucle de polling principale (optimisée avec parallélisation), jusqu'à stop_event.
+        La boucle possède son pool: il n'est fermé qu'à sa sortie, jamais en plein poll.
+        """
         logger.info(f"HFT Poll loop démarrée (interval: {self._poll_interval}s, parallèle)")
+        try:
+            while not stop_event.is_set():
+                poll_start = time.monotonic()
+                signals = []
 
-        while self._running:
-            poll_start = time.time()
+                try:
+                    self.polls_count += 1
 
-            try:
-                self.polls_count += 1
+                    # Polling parallèle de tous les wallets
+                    signals = self._poll_all_wallets_batched(executor)
 
-                # Polling parallèle de tous les wallets
-                signals = self._poll_all_wallets_parallel()
+                    for signal in signals:
+                        if stop_event.is_set():
+                            break
 
-                for signal in signals:
-                    if not self._running:
-                        break
+                        self.signals_detected += 1
+                        self.last_signal_time = signal.timestamp
+                        self.recent_signals.append(signal)
 
-                    self.signals_detected += 1
-                    self.last_signal_time = signal.timestamp
-                    self.recent_signals.append(signal)
+                        logger.info(
+                            f"⚡ HFT Signal: {signal.wallet_name} | {signal.side} "
+                            f"{signal.crypto_asset or 'TOKEN'} | ${signal.value_usd:.2f}"
+                        )
 
-                    logger.info(
-                        f"⚡ HFT Signal: {signal.wallet_name} | {signal.side} "
-                        f"{signal.crypto_asset or 'TOKEN'} | ${signal.value_usd:.2f}"
-                    )
+                        # Notifier les callbacks (thread dédié)
+                        self._callback_queue.put(signal)
 
-                    # Notifier les callbacks
-                    self._notify_callbacks(signal)
+                except Exception as e:
+                    logger.error(f"Erreur poll loop: {e}")
 
-            except Exception as e:
-                logger.error(f"Erreur poll loop: {e}")
+                self._update_poll_interval(bool(signals))
 
-            # Calculer le temps restant à attendre
-            poll_duration = time.time() - poll_start
-            sleep_time = max(0, self._poll_interval - poll_duration)
+                # Calculer le temps restant à attendre (jitter pour désynchroniser les instances)
+                poll_duration = time.monotonic() - poll_start
+                sleep_time = max(0, self._current_interval - poll_duration
+                                 + random.uniform(-self.POLL_JITTER_SEC, self.POLL_JITTER_SEC))
 
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+                if sleep_time > 0:
+                    stop_event.wait(sleep_time)
+        finally:
+            executor.shutdown(wait=False)
 
     # =========================================================================
     # CONTROL
     # =========================================================================
 
-    def _preload_positions_parallel(self):
+    def _preload_positions_parallel(self, executor: ThreadPoolExecutor):
         """Pré-charge les positions de tous les wallets en parallèle"""
         if not self.tracked_wallets:
             return
 
         logger.info(f"Pré-chargement positions HFT ({len(self.tracked_wallets)} wallets)...")
 
-        with ThreadPoolExecutor(max_workers=min(10, len(self.tracked_wallets) + 1)) as executor:
-            futures = {
-                executor.submit(self._get_user_positions, addr): addr
-                for addr in self.tracked_wallets.keys()
-            }
+        futures = {
+            executor.submit(self._get_user_positions, addr): addr
+            for addr in self.tracked_wallets.keys()
+        }
 
-            for future in as_completed(futures, timeout=15):
-                wallet_addr = futures[future]
-                try:
-                    positions = future.result()
-                    self._last_positions[wallet_addr] = positions
-                    logger.info(f"  ✓ {wallet_addr[:10]}...: {len(positions)} positions")
-                except Exception as e:
-                    logger.warning(f"  ✗ {wallet_addr[:10]}...: {e}")
-                    self._last_positions[wallet_addr] = {}
+        for future in as_completed(futures, timeout=15):
+            wallet_addr = futures[future]
+            try:
+                positions = future.result()
+                self._last_positions[wallet_addr] = positions
+                logger.info(f"  ✓ {wallet_addr[:10]}...: {len(positions)} positions")
+            except Exception as e:
+                logger.warning(f"  ✗ {wallet_addr[:10]}...: {e}")
+                self._last_positions[wallet_addr] = {}
 
     def start(self):
         """Démarre le monitoring"""
@@ -412,20 +666,30 @@ class HFTTradeMonitor:
             logger.warning("HFTTradeMonitor déjà en cours")
             return
 
+        # Attendre la fin de la boucle précédente (poll en cours) pour ne jamais en avoir deux
+        if self._poll_thread is not None and self._poll_thread.is_alive():
+            self._poll_thread.join(timeout=self.STOP_JOIN_TIMEOUT_SEC)
+            if self._poll_thread.is_alive():
+                logger.warning("Ancienne boucle de polling HFT encore active (elle s'arrêtera après son poll)")
+
         self._running = True
+        self._stop_event = threading.Event()
+        # Pool persistant du polling parallèle: créé ici, fermé par la boucle à sa sortie
+        executor = ThreadPoolExecutor(max_workers=self.POLL_WORKERS, thread_name_prefix='hft-poll')
 
         # Pré-charger les positions en parallèle (évite faux signaux au démarrage)
-        self._preload_positions_parallel()
+        self._preload_positions_parallel(executor)
 
         # Démarrer le polling
-        self._poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._poll_thread = threading.Thread(target=self._poll_loop, args=(self._stop_event, executor), daemon=True)
         self._poll_thread.start()
 
         logger.info(f"HFTTradeMonitor démarré ({len(self.tracked_wallets)} wallets, polling {self._poll_interval}s)")
 
     def stop(self):
-        """Arrête le monitoring"""
+        """Arrête le monitoring (la boucle en attente est réveillée, elle ferme son pool en sortant)"""
         self._running = False
+        self._stop_event.set()
         logger.info("HFTTradeMonitor arrêté")
 
     def get_recent_signals(self, limit: int = 50) -> List[Dict]:
@@ -443,6 +707,7 @@ class HFTTradeMonitor:
             'signals_detected': self.signals_detected,
             'last_signal': self.last_signal_time.isoformat() if self.last_signal_time else None,
             'poll_interval': self._poll_interval,
+            'current_poll_interval': self._current_interval,
             'polls_count': self.polls_count,
             'recent_signals_count': len(self.recent_signals),
             # Nouvelles stats cache
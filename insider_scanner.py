@@ -6,15 +6,30 @@ Scanne les marches actifs pour identifier les wallets avec des patterns de tradi
 v3.2: Intégration GoldskyRateLimiter pour éviter les conflits avec HFT Monitor
 """
 import os
+import json
+import atexit
+import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import threading
 import time
+import random
 import logging
-from typing import List, Dict, Optional, Callable
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Callable, Any
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from dataclasses import dataclass
 from enum import Enum
 
+# Parser JSON rapide (optionnel, fallback sur json standard)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Rate limiter partagé
 from goldsky_rate_limiter import get_goldsky_rate_limiter, Priority
 
@@ -22,8 +37,113 @@ from goldsky_rate_limiter import get_goldsky_rate_limiter, Priority
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("InsiderScanner")
 
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+
+class _TTLCache:
+    """
+    Cache borné (LRU) avec expiration (TTL), thread-safe.
+    Les entrées sont rangées par date d'écriture: les expirées et l'excédent sont retirés en tête.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # {key: (value, horloge monotone)}
+        self._lock = threading.Lock()
+
+    def get(self, key, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                return default
+            return entry[0]
+
+    def set(self, key, value: Any):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+            while self._data:
+                oldest_time = next(iter(self._data.values()))[1]
+                if len(self._data) <= self.maxsize and now - oldest_time < self.ttl:
+                    break
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _TokenBucket:
+    """
+    Token bucket thread-safe: `rate` jetons/s, rafale max `capacity`.
+    acquire() bloque juste le temps nécessaire pour obtenir un jeton.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Réserve un jeton et retourne l'attente nécessaire (0 si disponible)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _RollingStats:
+    """
+    Moyenne / écart-type glissants sur une fenêtre de temps (somme et somme des carrés
+    mises à jour en O(1) à l'ajout et à l'expiration).
+    """
+
+    def __init__(self, window_sec: float, max_samples: int):
+        self.window_sec = window_sec
+        self._samples = deque(maxlen=max_samples)  # [(horloge monotone, valeur)]
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def add(self, value: float, now: float):
+        if len(self._samples) == self._samples.maxlen:
+            self._drop(self._samples[0][1])
+        self._samples.append((now, value))
+        self._sum += value
+        self._sumsq += value * value
+
+    def _drop(self, value: float):
+        self._sum -= value
+        self._sumsq -= value * value
 
+    def expire(self, now: float):
+        while self._samples and now - self._samples[0][0] > self.window_sec:
+            self._drop(self._samples.popleft()[1])
 
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def mean_std(self) -> tuple:
+        n = len(self._samples)
+        if not n:
+            return 0.0, 0.0
+        mean = self._sum / n
+        variance = max(0.0, self._sumsq / n - mean * mean)
+        return mean, variance ** 0.5
 
 
 @dataclass
@@ -38,7 +158,7 @@ class InsiderAlert:
     token_id: str
     bet_amount: float
     bet_outcome: str
-    outcome_odds: float
+    outcome_odds: Optional[float]  # None si l'outcome acheté n'a pas pu être résolu
     trigger_details: str # [NEW] Details humains du declencheur (ex: "New Wallet (>500$)")
     bet_details: str     # [NEW] Description precise du pari (ex: "$600 on NO @ 0.30")
     wallet_stats: Dict
@@ -48,7 +168,26 @@ class InsiderAlert:
     nickname: str = ""
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Dict explicite: asdict() copie récursivement chaque champ
+        return {
+            'id': self.id,
+            'wallet_address': self.wallet_address,
+            'alert_type': self.alert_type,
+            'market_question': self.market_question,
+            'market_slug': self.market_slug,
+            'market_url': self.market_url,
+            'token_id': self.token_id,
+            'bet_amount': self.bet_amount,
+            'bet_outcome': self.bet_outcome,
+            'outcome_odds': self.outcome_odds,
+            'trigger_details': self.trigger_details,
+            'bet_details': self.bet_details,
+            'wallet_stats': dict(self.wallet_stats),  # Stats plates: copie superficielle suffisante
+            'timestamp': self.timestamp,
+            'dedup_key': self.dedup_key,
+            'suspicion_score': self.suspicion_score,
+            'nickname': self.nickname,
+        }
 
 
 class InsiderScanner:
@@ -66,6 +205,60 @@ class InsiderScanner:
     # Categories de marches a scanner
     DEFAULT_CATEGORIES = ["politics", "sports", "crypto", "pop-culture"]
 
+    # Nombre de marchés par requête GraphQL groupée (limite de complexité du subgraph)
+    SNAPSHOT_BATCH_SIZE = 20
+
+    # Requêtes GraphQL Goldsky: texte constant, paramètres passés en variables
+    _ACTIVITY_FIELDS = 'id user balance asset { id }'
+    _ACTIVITY_QUERY = (
+        'query Activity($cond: String!, $limit: Int!) { '
+        'userBalances(first: $limit, orderBy: balance, orderDirection: desc, '
+        'where: {asset_: {condition: $cond}, balance_gt: "0"}) '
+        '{ ' + _ACTIVITY_FIELDS + ' } }'
+    )
+    _WALLET_BALANCES_QUERY = (
+        'query WalletBalances($user: String!) { '
+        'userBalances(first: 200, where: {user: $user}) '
+        '{ id balance cost asset { id } } }'
+    )
+    # Note: balance_gt attend souvent une chaine pour les BigInt dans Goldsky
+    _WALLET_POSITIONS_QUERY = (
+        'query WalletPositions($user: String!) { '
+        'userBalances(first: 100, where: {user: $user, balance_gt: "0"}) '
+        '{ id balance asset { id condition { id } } } }'
+    )
+    _activity_batch_queries: Dict[int, str] = {}  # {taille du lot: requête aliasée}
+
+    # Etat persiste entre redemarrages (snapshots de marches + cache de dedup)
+    STATE_FILE = 'insider_state.json'
+    STATE_VERSION = 2  # v2: holders indexés par position "user:token_id"
+    CONFIG_FILE = 'insider_config.json'
+    CONFIG_SAVE_DEBOUNCE_SEC = 2.0  # Les sauvegardes rapprochées sont regroupées en une écriture
+
+    # Gamma: fenêtres de 10s, on reste sous ~120 requêtes / 10s (rafale = une fenêtre)
+    GAMMA_RATE_PER_SEC = 12
+    GAMMA_BURST = 120
+    GAMMA_MAX_RETRIES = 2
+    RETRY_AFTER_MAX_SEC = 30
+
+    # Threads de récupération réseau par scan (marchés + snapshots par catégorie)
+    SCAN_WORKERS = 8
+
+    # Polygonscan (free tier): 5 requêtes/s, profils pré-chargés en parallèle dans cette limite
+    POLYGONSCAN_RATE_PER_SEC = 5
+    PROFILE_WORKERS = 5
+
+    # Baseline glissante par marché (24h): mise "anormale" si > moyenne + N écarts-types
+    BASELINE_WINDOW_SEC = 24 * 3600
+    BASELINE_MAX_SAMPLES = 2000
+    BASELINE_MIN_SAMPLES = 20  # En dessous: seuil statique high_amount
+    BASELINE_SIGMAS = 3.0
+
+    # Bornes mémoire des caches
+    WALLET_CACHE_MAX = 5000
+    BORING_WALLETS_MAX = 50_000
+    MAX_MARKET_SNAPSHOTS = 500
+
     def __init__(self, socketio=None, db_manager=None):
         self.socketio = socketio
         self.db_manager = db_manager
@@ -112,18 +305,41 @@ class InsiderScanner:
         }
 
         # Deduplication cache: {dedup_key: timestamp}
-        self.recent_alerts = {}
+        self.recent_alerts: OrderedDict = OrderedDict()  # {dedup_key: time.monotonic()}, ordre chronologique
         self.dedup_window = 3600  # 1 heure
 
+        # Session HTTP partagée (keep-alive Gamma / Goldsky / Polygonscan)
+        # Retry transport uniquement sur les erreurs passerelle; les 429 sont gérés par _gamma_get
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4, pool_maxsize=20,
+            max_retries=Retry(total=3, connect=0, read=0, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        ))
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Content-Type': 'application/json',
+        })
+
+        # Limiteur de débit Gamma (partagé par le scan et les profils à la demande)
+        self._gamma_bucket = _TokenBucket(self.GAMMA_RATE_PER_SEC, self.GAMMA_BURST)
+        self._polygonscan_bucket = _TokenBucket(self.POLYGONSCAN_RATE_PER_SEC, self.POLYGONSCAN_RATE_PER_SEC)
+
         # Callbacks pour integrations externes
         self.callbacks = []
 
         # Cache pour eviter requetes repetees
-        self._wallet_tx_cache = {}  # {address: {count, timestamp}}
-        self._wallet_activity_cache = {}  # {address: {last_activity, timestamp}}
-        self._market_cache = {}  # {token_id: {data, timestamp}}
-        self._market_snapshots = {} # {condition_id: {user: balance, _updated: datetime}}
+        # Caches bornés (TTL 1h) pour ne pas croître indéfiniment sur un scanner long
+        self._wallet_profile_cache = _TTLCache(maxsize=self.WALLET_CACHE_MAX, ttl=3600)  # {address: {tx_count, last_activity}}
+        self._market_cache = _TTLCache(maxsize=self.WALLET_CACHE_MAX, ttl=3600)  # {token_id: data}
+        # Pseudonymes Polymarket: changent rarement (24h); échecs / profils sans nom re-tentés après 1h
+        self._username_cache = _TTLCache(maxsize=self.WALLET_CACHE_MAX, ttl=24 * 3600)
+        self._username_misses = _TTLCache(maxsize=self.WALLET_CACHE_MAX, ttl=3600)
+        # Wallets "sans interet" (ni nouveaux ni dormants): profil Polygonscan saute pendant 24h
+        self._boring_wallets = _TTLCache(maxsize=self.BORING_WALLETS_MAX, ttl=24 * 3600)
+        self._market_snapshots: OrderedDict = OrderedDict() # LRU {condition_id: {"user:token_id": balance, _updated: datetime}}
         self._max_snapshot_age = 3600 * 6  # 6 heures max pour les snapshots
+        self._market_baselines: OrderedDict = OrderedDict()  # LRU {condition_id: _RollingStats}
 
         # Stats
         self.alerts_generated = 0
@@ -136,9 +352,17 @@ class InsiderScanner:
         else:
             logger.info("   ⚠️ Polygonscan API non configuree (detection profil limitee)")
         
+        # Sauvegarde de config différée (debounce)
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_timer_lock = threading.Lock()
+        atexit.register(self._flush_pending_config)
+
         # Charger la config persistante
         self.load_config_from_file()
 
+        # Recharger les snapshots et la dedup du dernier run (evite un scan "a blanc" au demarrage)
+        self.load_state_from_file()
+
     def set_polygonscan_key(self, api_key: str):
         """Met à jour la clé API Polygonscan à chaud"""
         self.polygonscan_api_key = api_key
@@ -157,25 +381,65 @@ class InsiderScanner:
             elif key in self.config:
                 self.config[key] = value
 
+        # Les seuils ont pu changer: un wallet "sans interet" doit etre re-evalue
+        self._boring_wallets = _TTLCache(maxsize=self.BORING_WALLETS_MAX, ttl=24 * 3600)
+
         self.save_config_to_file()
         logger.info(f"📝 Config mise a jour et sauvegardee.")
 
     def save_config_to_file(self):
-        """Sauvegarde la configuration dans un fichier JSON"""
+        """Programme la sauvegarde de la configuration (debounce: une rafale = une écriture)"""
+        with self._save_timer_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.CONFIG_SAVE_DEBOUNCE_SEC, self.flush_config)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_pending_config(self):
+        """À l'arrêt du process: n'écrit que si une sauvegarde était programmée"""
+        if self._save_timer is not None:
+            self.flush_config()
+
+    def flush_config(self):
+        """Écrit immédiatement la configuration sur disque (annule la sauvegarde programmée)"""
+        with self._save_timer_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
         try:
-            import json
-            with open('insider_config.json', 'w') as f:
-                # Save purely the config dict, not runtime state like running/stats
-                json.dump(self.config, f, indent=4)
+            # Save purely the config dict, not runtime state like running/stats
+            self._write_file_atomic(self.CONFIG_FILE, json.dumps(self.config, indent=4))
         except Exception as e:
             logger.error(f"❌ Erreur sauvegarde config: {e}")
 
+    @staticmethod
+    def _write_file_atomic(path: str, data):
+        """
+        Écrit dans un fichier temporaire unique puis os.replace: jamais de fichier tronqué
+        à la relecture, même si deux threads sauvegardent le même fichier en même temps.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or '.', prefix=f"{os.path.basename(path)}.", suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
     def load_config_from_file(self):
         """Charge la configuration depuis un fichier JSON"""
         try:
-            import json
-            if os.path.exists('insider_config.json'):
-                with open('insider_config.json', 'r') as f:
+            if os.path.exists(self.CONFIG_FILE):
+                with open(self.CONFIG_FILE, 'r') as f:
                     saved_config = json.load(f)
                     
                     # Merge loaded config into default config
@@ -188,6 +452,62 @@ class InsiderScanner:
         except Exception as e:
             logger.error(f"❌ Erreur chargement config: {e}")
 
+    def save_state_to_file(self):
+        """Sauvegarde les snapshots de marches et le cache de dedup dans un fichier JSON"""
+        try:
+            with self._snapshot_lock:
+                snapshots = {
+                    cid: {
+                        'updated': snapshot['_updated'].timestamp() if snapshot.get('_updated') else None,
+                        'holders': {user: bal for user, bal in snapshot.items() if user != '_updated'}
+                    }
+                    for cid, snapshot in self._market_snapshots.items()
+                }
+            # Horloge monotone -> horodatage mural (seul comparable d'un process à l'autre)
+            wall_offset = time.time() - time.monotonic()
+            recent_alerts = {key: ts + wall_offset for key, ts in list(self.recent_alerts.items())}
+
+            self._write_file_atomic(
+                self.STATE_FILE, _json_dumps({'version': self.STATE_VERSION, 'snapshots': snapshots, 'recent_alerts': recent_alerts})
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur sauvegarde etat scanner: {e}")
+
+    def load_state_from_file(self):
+        """Recharge les snapshots et la dedup encore valides depuis le fichier JSON"""
+        try:
+            if not os.path.exists(self.STATE_FILE):
+                return
+            with open(self.STATE_FILE, 'r') as f:
+                state = json.load(f)
+
+            now = datetime.now()
+            loaded = 0
+            # Snapshots d'un ancien format (indexés par user seul): ignorés, les marchés se ré-initialisent
+            snapshots = state.get('snapshots', {}) if state.get('version') == self.STATE_VERSION else {}
+            with self._snapshot_lock:
+                for cid, entry in snapshots.items():
+                    if not entry.get('updated'):
+                        continue
+                    updated = datetime.fromtimestamp(entry['updated'])
+                    if (now - updated).total_seconds() > self._max_snapshot_age:
+                        continue
+                    holders = dict(entry.get('holders', {}))
+                    holders['_updated'] = updated
+                    self._market_snapshots[cid] = holders
+                    loaded += 1
+
+            wall_now = time.time()
+            mono_now = time.monotonic()
+            for key, ts in sorted(state.get('recent_alerts', {}).items(), key=lambda item: item[1]):
+                age = wall_now - ts
+                if age < self.dedup_window:
+                    self.recent_alerts[key] = mono_now - age
+
+            logger.info(f"✅ Etat scanner recharge: {loaded} snapshots, {len(self.recent_alerts)} alertes recentes")
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement etat scanner: {e}")
+
     def get_config(self) -> Dict:
         """Retourne la configuration actuelle"""
         return {
@@ -208,6 +528,27 @@ class InsiderScanner:
     # DATA SOURCES
     # =========================================================================
 
+    def _gamma_get(self, url: str, params: Dict = None, timeout: int = 10) -> requests.Response:
+        """
+        GET Gamma API via le token bucket. Sur 429, respecte Retry-After (sinon backoff
+        exponentiel avec jitter) puis réessaie jusqu'à GAMMA_MAX_RETRIES fois.
+        """
+        attempt = 0
+        while True:
+            self._gamma_bucket.acquire()
+            resp = self.session.get(url, params=params, timeout=timeout)
+            if resp.status_code != 429 or attempt >= self.GAMMA_MAX_RETRIES:
+                return resp
+
+            try:
+                delay = float(resp.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = 2 ** attempt
+            delay = min(self.RETRY_AFTER_MAX_SEC, delay) + random.random() * 0.5
+            logger.warning(f"Gamma API rate limited (429), nouvel essai dans {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
     def get_markets_by_category(self, category: str, limit: int = 50) -> List[Dict]:
         """Recupere les marches actifs par categorie via Gamma API"""
         try:
@@ -218,9 +559,9 @@ class InsiderScanner:
                 'order': 'volume',
                 'ascending': 'false'
             }
-            resp = requests.get(f"{self.GAMMA_API}/markets", params=params, timeout=10)
+            resp = self._gamma_get(f"{self.GAMMA_API}/markets", params=params, timeout=10)
             if resp.status_code == 200:
-                return resp.json()
+                return _json_loads(resp.content)
             return []
         except Exception as e:
             logger.error(f"❌ Erreur get_markets_by_category ({category}): {e}")
@@ -230,9 +571,9 @@ class InsiderScanner:
         """Recupere tous les marches actifs"""
         try:
             params = {'limit': limit, 'active': 'true'}
-            resp = requests.get(f"{self.GAMMA_API}/markets", params=params, timeout=10)
+            resp = self._gamma_get(f"{self.GAMMA_API}/markets", params=params, timeout=10)
             if resp.status_code == 200:
-                return resp.json()
+                return _json_loads(resp.content)
             return []
         except Exception as e:
             logger.error(f"❌ Erreur get_all_active_markets: {e}")
@@ -248,38 +589,24 @@ class InsiderScanner:
 
         # 1. Recuperer l'etat ACTUEL des balances (Top N holders pour avoir une bonne couverture)
         # On ne filtre pas par high balance pour voir les petits insiders.
-        query = """
-        {
-          userBalances(
-            first: %d,
-            orderBy: balance,
-            orderDirection: desc,
-            where: { asset_: { condition: "%s" }, balance_gt: "0" } 
-          ) {
-            id
-            user
-            balance
-            asset {
-              id
-            }
-          }
-        }
-        """ % (limit, condition_id)
+        payload = _json_dumps({
+            'query': self._ACTIVITY_QUERY,
+            'variables': {'cond': condition_id, 'limit': limit},
+        })
 
         try:
             # Rate limiter - attendre un slot disponible (priorité INSIDER)
             rate_limiter = get_goldsky_rate_limiter()
             rate_limiter.wait_for_slot(Priority.INSIDER)
 
-            resp = requests.post(self.GOLDSKY_POSITIONS, json={'query': query}, timeout=15)
+            resp = self.session.post(self.GOLDSKY_POSITIONS, data=payload, timeout=15)
 
             current_holders = {} # {user: balance}
-            activities = []
 
             if resp.status_code == 200:
                 rate_limiter.report_success()
                 try:
-                    data = resp.json()
+                    data = _json_loads(resp.content)
                 except Exception as json_err:
                     logger.warning(f"Invalid JSON response from Goldsky: {json_err}")
                     return []
@@ -290,70 +617,160 @@ class InsiderScanner:
                     return []
 
                 if 'data' in data and data['data'] and data['data'].get('userBalances'):
-                    raw_positions = data['data']['userBalances']
-
                     # Construire la map actuelle
-                    for p in raw_positions:
-                        user = p.get('user')
-                        balance = float(p.get('balance', 0))
-                        current_holders[user] = balance
+                    current_holders = self._holders_from_balances(data['data']['userBalances'])
             elif resp.status_code == 429:
                 rate_limiter.report_rate_limit()
                 logger.warning(f"Goldsky API rate limited (429)")
             else:
                 logger.warning(f"Goldsky API returned status {resp.status_code}")
 
-            # 2. Comparer avec le snapshot PRECEDENT (thread-safe)
-            # Si c'est le premier scan, on ne genere PAS d'alerte (sinon on alerte sur tout le monde)
-            # On initialise juste le snapshot.
-            with self._snapshot_lock:
-                if condition_id in self._market_snapshots:
-                    last_holders = self._market_snapshots[condition_id].copy()  # Copy pour éviter race condition
-
-                    # Detecter les NOUVEAUX et les AUGMENTATIONS
-                    for user, current_bal in current_holders.items():
-                        old_bal = last_holders.get(user, 0)
-
-                        # Seuil minimum de changement (ex: 10$ -> ~10_000_000 units)
-                        # Mais on laisse process_activity filtrer par montant USD ($10)
-                        if current_bal > old_bal:
-                            diff = current_bal - old_bal
-
-                            # 🔧 FIX: Inclure condition_id et token_id dans l'activité
-                            activities.append({
-                                'user': user,
-                                'amount': diff,
-                                'timestamp': datetime.now().timestamp(),
-                                'type': 'POSITION_INCREASE',
-                                'condition_id': condition_id,  # Ajouté pour traçabilité
-                                'balance': current_bal
-                            })
-                else:
-                    # Premier passage : on ne sait pas ce qui est nouveau, on apprend juste l'etat du marche.
-                    pass
-
-                # 3. Mettre a jour le snapshot avec timestamp
-                current_holders['_updated'] = datetime.now()
-                self._market_snapshots[condition_id] = current_holders
-            
-            return activities
+            return self._diff_market_snapshot(condition_id, current_holders)
 
         except Exception as e:
             logger.debug(f"Error fetching activity snapshot: {e}")
             return []
 
-    def get_wallet_tx_count(self, address: str) -> int:
-        """Recupere le nombre de transactions d'un wallet via Polygonscan (avec cache)"""
+    def get_recent_market_activity_batch(self, condition_ids: List[str], limit: int = 300) -> Dict[str, List[Dict]]:
+        """
+        Version groupée de get_recent_market_activity: un alias userBalances par marché
+        (m0, m1, ...), SNAPSHOT_BATCH_SIZE marchés par requête GraphQL.
+        Retourne {condition_id: activities}; un marché en échec est absent du résultat
+        et son snapshot n'est pas modifié.
+        """
+        results: Dict[str, List[Dict]] = {}
+        condition_ids = [cid for cid in condition_ids if cid]
+        rate_limiter = get_goldsky_rate_limiter()
+
+        for start in range(0, len(condition_ids), self.SNAPSHOT_BATCH_SIZE):
+            chunk = condition_ids[start:start + self.SNAPSHOT_BATCH_SIZE]
+            variables = {f'c{i}': cid for i, cid in enumerate(chunk)}
+            variables['limit'] = limit
+
+            try:
+                rate_limiter.wait_for_slot(Priority.INSIDER)
+                resp = self.session.post(
+                    self.GOLDSKY_POSITIONS,
+                    data=_json_dumps({'query': self._activity_batch_query(len(chunk)), 'variables': variables}),
+                    timeout=15
+                )
+
+                if resp.status_code == 429:
+                    rate_limiter.report_rate_limit()
+                    logger.warning(f"Goldsky API rate limited (429)")
+                    continue
+                if resp.status_code != 200:
+                    logger.warning(f"Goldsky API returned status {resp.status_code}")
+                    continue
+
+                rate_limiter.report_success()
+                data = _json_loads(resp.content)
+                if 'errors' in data:
+                    logger.warning(f"Goldsky GraphQL errors: {data['errors']}")
+                    continue
+
+                balances_by_alias = data.get('data') or {}
+                for i, cid in enumerate(chunk):
+                    balances = balances_by_alias.get(f'm{i}')
+                    if balances is None:
+                        continue
+                    results[cid] = self._diff_market_snapshot(cid, self._holders_from_balances(balances))
+            except Exception as e:
+                logger.debug(f"Error fetching batched activity snapshot: {e}")
+
+        return results
+
+    @classmethod
+    def _activity_batch_query(cls, size: int) -> str:
+        """Requête aliasée (m0..mN, variables $c0..$cN) pour un lot de `size` marchés, construite une fois par taille"""
+        query = cls._activity_batch_queries.get(size)
+        if query is None:
+            params = ", ".join(f"$c{i}: String!" for i in range(size))
+            aliases = " ".join(
+                f'm{i}: userBalances(first: $limit, orderBy: balance, orderDirection: desc, '
+                f'where: {{asset_: {{condition: $c{i}}}, balance_gt: "0"}}) '
+                f'{{ {cls._ACTIVITY_FIELDS} }}'
+                for i in range(size)
+            )
+            query = f"query ActivityBatch({params}, $limit: Int!) {{ {aliases} }}"
+            cls._activity_batch_queries[size] = query
+        return query
+
+    @staticmethod
+    def _holders_from_balances(raw_positions: List[Dict]) -> Dict[str, float]:
+        """
+        Construit la map {"user:token_id": balance} d'un marché depuis les userBalances Goldsky.
+        Une entrée par position: un wallet qui détient YES et NO a deux soldes distincts.
+        """
+        return {
+            f"{p.get('user')}:{(p.get('asset') or {}).get('id', '')}": float(p.get('balance', 0))
+            for p in raw_positions
+        }
+
+    def _diff_market_snapshot(self, condition_id: str, current_holders: Dict) -> List[Dict]:
+        """
+        Compare les holders actuels au snapshot PRECEDENT du marché (thread-safe) et
+        retourne les NOUVELLES positions / AUGMENTATIONS, puis remplace le snapshot.
+        Si c'est le premier scan, on ne genere PAS d'alerte (sinon on alerte sur tout le monde):
+        on initialise juste le snapshot.
+        """
+        activities = []
+        detected_at = datetime.now()  # Un seul horodatage pour tout le diff
+        detected_ts = detected_at.timestamp()
+        with self._snapshot_lock:
+            if condition_id in self._market_snapshots:
+                last_holders = self._market_snapshots[condition_id].copy()  # Copy pour éviter race condition
+
+                # Detecter les NOUVEAUX et les AUGMENTATIONS
+                for holder, current_bal in current_holders.items():
+                    old_bal = last_holders.get(holder, 0)
+
+                    # Seuil minimum de changement (ex: 10$ -> ~10_000_000 units)
+                    # Mais on laisse process_activity filtrer par montant USD ($10)
+                    if current_bal > old_bal:
+                        diff = current_bal - old_bal
+
+                        # 🔧 FIX: Inclure condition_id et token_id dans l'activité
+                        user, _, token_id = holder.partition(':')
+                        activities.append({
+                            'user': user,
+                            'asset': {'id': token_id},
+                            'amount': diff,
+                            'timestamp': detected_ts,
+                            'type': 'POSITION_INCREASE',
+                            'condition_id': condition_id,  # Ajouté pour traçabilité
+                            'balance': current_bal
+                        })
+            else:
+                # Premier passage : on ne sait pas ce qui est nouveau, on apprend juste l'etat du marche.
+                pass
+
+            # Mettre a jour le snapshot avec timestamp
+            current_holders['_updated'] = detected_at
+            self._market_snapshots[condition_id] = current_holders
+            self._market_snapshots.move_to_end(condition_id)
+
+            # LRU: retirer les marchés les moins récemment scannés au-delà de la limite
+            while len(self._market_snapshots) > self.MAX_MARKET_SNAPSHOTS:
+                self._market_snapshots.popitem(last=False)
+
+        return activities
+
+    def get_wallet_profile(self, address: str) -> Dict:
+        """
+        Recupere en UN appel Polygonscan (txlist, 100 dernieres tx) le nombre de transactions
+        et la date de derniere activite d'un wallet (avec cache 1h).
+        Retourne {'tx_count': int, 'last_activity': Optional[datetime]}.
+        """
         if not self.polygonscan_api_key:
-            return 999  # Assume pas nouveau si on ne peut pas verifier
+            return {'tx_count': 999, 'last_activity': None}  # Assume pas nouveau si on ne peut pas verifier
 
         addr_lower = address.lower()
 
         # Verifier le cache (1 heure)
-        if addr_lower in self._wallet_tx_cache:
-            cached = self._wallet_tx_cache[addr_lower]
-            if datetime.now() - cached['timestamp'] < timedelta(hours=1):
-                return cached['count']
+        cached = self._wallet_profile_cache.get(addr_lower)
+        if cached is not None:
+            return cached
 
         try:
             # Polygonscan API (standard format)
@@ -366,67 +783,39 @@ class InsiderScanner:
                 'sort': 'desc',
                 'apikey': self.polygonscan_api_key
             }
-            resp = requests.get(self.POLYGONSCAN_API, params=params, timeout=10)
+            self._polygonscan_bucket.acquire()
+            resp = self.session.get(self.POLYGONSCAN_API, params=params, timeout=10)
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 # API returns status '1' on success
                 if data.get('status') == '1':
-                    count = len(data.get('result', []))
-                    self._wallet_tx_cache[addr_lower] = {'count': count, 'timestamp': datetime.now()}
-                    logger.debug(f"TX count for {address[:10]}...: {count}")
-                    return count
+                    result = data.get('result', [])
+                    ts = int(result[0].get('timeStamp', 0)) if result else 0
+                    profile = {
+                        'tx_count': len(result),
+                        'last_activity': datetime.fromtimestamp(ts) if ts > 0 else None
+                    }
+                    self._wallet_profile_cache.set(addr_lower, profile)
+                    logger.debug(f"Profile for {address[:10]}...: {profile['tx_count']} tx, last {profile['last_activity']}")
+                    return profile
                 elif 'No transactions found' in str(data.get('message', '')):
-                    self._wallet_tx_cache[addr_lower] = {'count': 0, 'timestamp': datetime.now()}
-                    return 0
+                    profile = {'tx_count': 0, 'last_activity': None}
+                    self._wallet_profile_cache.set(addr_lower, profile)
+                    return profile
                 else:
                     logger.warning(f"Polygonscan API error: {data.get('message', 'Unknown')}")
-            return 0
+            return {'tx_count': 0, 'last_activity': None}
         except Exception as e:
-            logger.warning(f"Polygonscan tx count error: {e}")
-            return 999
+            logger.warning(f"Polygonscan profile error: {e}")
+            return {'tx_count': 999, 'last_activity': None}
+
+    def get_wallet_tx_count(self, address: str) -> int:
+        """Recupere le nombre de transactions d'un wallet via Polygonscan (avec cache)"""
+        return self.get_wallet_profile(address)['tx_count']
 
     def get_wallet_last_activity(self, address: str) -> Optional[datetime]:
         """Recupere la date de derniere activite d'un wallet (avec cache)"""
-        if not self.polygonscan_api_key:
-            return None
-
-        addr_lower = address.lower()
-
-        # Verifier le cache (1 heure)
-        if addr_lower in self._wallet_activity_cache:
-            cached = self._wallet_activity_cache[addr_lower]
-            if datetime.now() - cached['timestamp'] < timedelta(hours=1):
-                return cached['last_activity']
-
-        try:
-            # Polygonscan API (standard format)
-            params = {
-                'module': 'account',
-                'action': 'txlist',
-                'address': address,
-                'page': 1,
-                'offset': 1,
-                'sort': 'desc',
-                'apikey': self.polygonscan_api_key
-            }
-            resp = requests.get(self.POLYGONSCAN_API, params=params, timeout=10)
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get('status') == '1' and data.get('result'):
-                    ts = int(data['result'][0].get('timeStamp', 0))
-                    last_activity = datetime.fromtimestamp(ts) if ts > 0 else None
-                    self._wallet_activity_cache[addr_lower] = {
-                        'last_activity': last_activity,
-                        'timestamp': datetime.now()
-                    }
-                    logger.debug(f"Last activity for {address[:10]}...: {last_activity}")
-                    return last_activity
-                elif data.get('message') == 'No transactions found':
-                    return None
-            return None
-        except Exception as e:
-            logger.warning(f"Polygonscan last activity error: {e}")
-            return None
+        return self.get_wallet_profile(address)['last_activity']
 
     def get_wallet_performance(self, address: str) -> Dict:
         """Calcule les stats de performance d'un wallet via Gamma API public-profile"""
@@ -440,10 +829,10 @@ class InsiderScanner:
         try:
             # Utiliser l'API Gamma pour les stats du profil (plus fiable que le subgraph)
             url = f"{self.GAMMA_API}/public-profile?address={address.lower()}"
-            resp = requests.get(url, timeout=10)
+            resp = self._gamma_get(url, timeout=10)
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 
                 # Extraire les stats disponibles
                 pnl = data.get('pnl') or data.get('profit') or 0
@@ -469,27 +858,16 @@ class InsiderScanner:
             
             # Fallback: utiliser Goldsky subgraph
             try:
-                query = """
-                {
-                  userBalances(first: 200, where: {user: "%s"}) {
-                    id
-                    balance
-                    cost
-                    asset {
-                      id
-                    }
-                  }
-                }
-                """ % address.lower()
+                payload = _json_dumps({'query': self._WALLET_BALANCES_QUERY, 'variables': {'user': address.lower()}})
 
                 # Rate limiter
                 rate_limiter = get_goldsky_rate_limiter()
                 rate_limiter.wait_for_slot(Priority.INSIDER)
 
-                resp = requests.post(self.GOLDSKY_POSITIONS, json={'query': query}, timeout=15)
+                resp = self.session.post(self.GOLDSKY_POSITIONS, data=payload, timeout=15)
                 if resp.status_code == 200:
                     rate_limiter.report_success()
-                    data = resp.json()
+                    data = _json_loads(resp.content)
                     balances = data.get('data', {}).get('userBalances', [])
 
                     total_cost = 0
@@ -528,41 +906,127 @@ class InsiderScanner:
     # TRIGGER DETECTION ALGORITHM
     # =========================================================================
 
-    def detect_triggers(self, wallet: str, bet_amount: float, outcome_odds: float) -> List[Dict]:
+    def _min_alert_amount(self) -> float:
+        """
+        Montant USD minimum pour qu'une activite puisse declencher un trigger actif
+        (filtre global 10$, puis plus petit min_amount des triggers actives).
+        """
+        enabled = [
+            self.config[name]['min_amount']
+            for name in ('risky_bet', 'whale_wakeup', 'fresh_wallet')
+            if self.config[name]['enabled']
+        ]
+        return max(10.0, min(enabled)) if enabled else float('inf')
+
+    def record_market_amounts(self, condition_id: str, amounts: List[float]):
+        """Alimente la baseline glissante d'un marché avec les montants USD observés"""
+        if not condition_id or not amounts:
+            return
+        now = time.monotonic()
+        stats = self._market_baselines.get(condition_id)
+        if stats is None:
+            stats = self._market_baselines[condition_id] = _RollingStats(
+                self.BASELINE_WINDOW_SEC, self.BASELINE_MAX_SAMPLES
+            )
+        self._market_baselines.move_to_end(condition_id)
+        while len(self._market_baselines) > self.MAX_MARKET_SNAPSHOTS:
+            self._market_baselines.popitem(last=False)
+
+        stats.expire(now)
+        for amount in amounts:
+            stats.add(amount, now)
+
+    def _high_stake_threshold(self, condition_id: str) -> float:
+        """
+        Seuil "gros montant" du marché: moyenne + BASELINE_SIGMAS écarts-types sur 24h
+        (jamais sous min_amount), ou high_amount statique si l'historique est trop court.
+        """
+        cfg_risky = self.config['risky_bet']
+        stats = self._market_baselines.get(condition_id) if condition_id else None
+        if stats is None:
+            return cfg_risky['high_amount']
+        stats.expire(time.monotonic())
+        if len(stats) < self.BASELINE_MIN_SAMPLES:
+            return cfg_risky['high_amount']
+        mean, std = stats.mean_std()
+        return max(cfg_risky['min_amount'], mean + self.BASELINE_SIGMAS * std)
+
+    def _mark_if_boring(self, wallet: str, profile: Dict):
+        """
+        Memorise 24h un wallet dont le profil (reellement recupere, donc en cache) ne peut
+        declencher ni FRESH_WALLET (trop de tx) ni WHALE_WAKEUP (actif, marge d'un jour incluse).
+        """
+        addr_lower = wallet.lower()
+        if self._wallet_profile_cache.get(addr_lower) is None:
+            return  # Profil de repli (erreur API): ne rien conclure
+        last_activity = profile['last_activity']
+        if last_activity is None:
+            return
+        too_many_tx = profile['tx_count'] > self.config['fresh_wallet']['max_tx']
+        recently_active = (datetime.now() - last_activity).days < self.config['whale_wakeup']['dormant_days'] - 1
+        if too_many_tx and recently_active:
+            self._boring_wallets.set(addr_lower, True)
+
+    def _min_profile_amount(self) -> float:
+        """Montant USD a partir duquel le profil Polygonscan du wallet est necessaire"""
+        return min(self.config['whale_wakeup']['min_amount'], self.config['fresh_wallet']['min_amount'])
+
+    def _prefetch_wallet_profiles(self, wallets):
+        """Pre-charge en parallele (dans la limite Polygonscan) les profils absents du cache"""
+        if not self.polygonscan_api_key:
+            return
+        missing = [
+            w for w in wallets
+            if self._wallet_profile_cache.get(w.lower()) is None and not self._boring_wallets.get(w.lower())
+        ]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=self.PROFILE_WORKERS, thread_name_prefix='insider-profile') as executor:
+            list(executor.map(self.get_wallet_profile, missing))
+
+    def detect_triggers(self, wallet: str, bet_amount: float, outcome_odds: Optional[float],
+                        condition_id: str = '') -> List[Dict]:
         """
         Verifie si l'activite declenche un ou plusieurs triggers.
         Retourne une liste de triggers actifs: [{'type': 'RISKY_BET', 'details': '...'}]
+        outcome_odds None (outcome non résolu): le test "Low Odds" est ignoré.
         """
         triggers = []
         
         # 1. TRIGGER A: RISKY BET (Le Sniper)
         cfg_risky = self.config['risky_bet']
         if cfg_risky['enabled']:
-            # Condition: Mise > 50$ ET (Cote < 35% OU Mise > 1000$)
+            # Condition: Mise > 50$ ET (Cote < 35% OU Mise anormale pour ce marché)
             if bet_amount >= cfg_risky['min_amount']:
-                is_low_odds = outcome_odds <= cfg_risky['max_odds']
-                is_high_amount = bet_amount >= cfg_risky['high_amount']
+                is_low_odds = outcome_odds is not None and outcome_odds <= cfg_risky['max_odds']
+                is_high_amount = bet_amount >= self._high_stake_threshold(condition_id)
                 
                 if is_low_odds or is_high_amount:
                     reason = "Low Odds" if is_low_odds else "High Stake"
+                    odds_desc = f"{outcome_odds:.2f}" if outcome_odds is not None else "n/d"
                     triggers.append({
                         'type': 'RISKY_BET',
                         'label': 'Pari Risqué',
-                        'details': f"{reason} (Odds: {outcome_odds:.2f})"
+                        'details': f"{reason} (Odds: {odds_desc})"
                     })
-                    logger.debug(f"  [TRIGGER] RISKY_BET: ${bet_amount} @ {outcome_odds:.2f}")
+                    logger.debug(f"  [TRIGGER] RISKY_BET: ${bet_amount} @ {odds_desc}")
 
         # Les triggers suivants necessitent des appels API couteux (Polygonscan)
         # On ne les verifie que si le montant depasse le seuil minimum du trigger LE PLUS BAS (ici 100$)
         # pour eviter de spammer l'API pour des paris de 10$ qui ne triggeront rien de toute facon.
         
-        min_profile_check = min(self.config['whale_wakeup']['min_amount'], self.config['fresh_wallet']['min_amount'])
-        if bet_amount < min_profile_check:
+        if bet_amount < self._min_profile_amount():
             return triggers
 
-        # Recuperation des infos wallet (avec cache)
-        last_activity = self.get_wallet_last_activity(wallet)
-        tx_count = self.get_wallet_tx_count(wallet)
+        # Wallet deja profile comme ni nouveau ni dormant: pas d'appel Polygonscan (24h)
+        if self._boring_wallets.get(wallet.lower()):
+            return triggers
+
+        # Recuperation des infos wallet (un seul appel Polygonscan, avec cache)
+        profile = self.get_wallet_profile(wallet)
+        last_activity = profile['last_activity']
+        tx_count = profile['tx_count']
+        self._mark_if_boring(wallet, profile)
 
         # 2. TRIGGER B: WHALE WAKEUP (Le Revenant)
         cfg_whale = self.config['whale_wakeup']
@@ -601,19 +1065,18 @@ class InsiderScanner:
 
     def _is_duplicate(self, dedup_key: str) -> bool:
         """Verifie si une alerte a deja ete generee dans la fenetre de dedup"""
-        if dedup_key in self.recent_alerts:
-            last_time = self.recent_alerts[dedup_key]
-            if (datetime.now() - last_time).total_seconds() < self.dedup_window:
-                return True
-        return False
+        last_time = self.recent_alerts.get(dedup_key)
+        return last_time is not None and time.monotonic() - last_time < self.dedup_window
 
     def _cleanup_dedup_cache(self):
         """Nettoie les entrees expirees du cache de dedup"""
-        now = datetime.now()
-        expired = [k for k, v in self.recent_alerts.items()
-                   if (now - v).total_seconds() > self.dedup_window]
-        for k in expired:
-            del self.recent_alerts[k]
+        now = time.monotonic()
+        # Entrées rangées par date: on s'arrête à la première encore valide
+        while self.recent_alerts:
+            key, seen_at = next(iter(self.recent_alerts.items()))
+            if now - seen_at <= self.dedup_window:
+                break
+            del self.recent_alerts[key]
 
     def _cleanup_old_snapshots(self):
         """Nettoie les snapshots de marchés trop vieux pour éviter fuite mémoire"""
@@ -630,6 +1093,39 @@ class InsiderScanner:
         if expired:
             logger.debug(f"🧹 Nettoyé {len(expired)} snapshots expirés")
 
+    @staticmethod
+    def _json_list(value) -> list:
+        """Champ liste Gamma (clobTokenIds, outcomes, outcomePrices): liste ou chaîne JSON"""
+        if isinstance(value, str):
+            try:
+                value = _json_loads(value)
+            except ValueError:
+                return []
+        return value if isinstance(value, list) else []
+
+    @classmethod
+    def _activity_odds(cls, activity: Dict, market: Dict) -> tuple:
+        """
+        Cote et outcome de la position achetée: le token de l'activité est retrouvé dans
+        clobTokenIds, dont l'index donne le prix (outcomePrices) et le libellé (outcomes).
+        Retourne (None, "?") si le token ne peut pas être résolu.
+        """
+        asset = activity.get('asset')
+        token_id = asset.get('id') if isinstance(asset, dict) else None
+        token_ids = cls._json_list(market.get('clobTokenIds'))
+        if not token_id or token_id not in token_ids:
+            return None, "?"
+
+        index = token_ids.index(token_id)
+        prices = cls._json_list(market.get('outcomePrices'))
+        outcomes = cls._json_list(market.get('outcomes'))
+        try:
+            odds = float(prices[index])
+        except (IndexError, ValueError, TypeError):
+            return None, "?"
+        outcome = str(outcomes[index]).upper() if index < len(outcomes) else "?"
+        return odds, outcome
+
     def process_activity(self, activity: Dict, market: Dict) -> Optional[InsiderAlert]:
         """Traite une activite et genere une alerte si un trigger est active"""
         wallet = activity.get('user', '')
@@ -644,53 +1140,24 @@ class InsiderScanner:
         if bet_amount < 10.0:
             return None
 
-        # Infos marche
+        # Deduplication avant tout parsing: la plupart des activites s'arretent ici ou aux triggers
         market_slug = market.get('slug', 'unknown')
-        market_question = market.get('question', 'Unknown Market')
-        token_id = activity.get('asset', {}).get('id', '') if isinstance(activity.get('asset'), dict) else ''
-
-        # Determiner l'outcome et les odds
-        outcome_prices = market.get('outcomePrices', [])
-        activity_type = activity.get('type', 'BUY')
-
-        # Parser le prix de l'activite ou utiliser les odds du marche
-        price = float(activity.get('price', 0)) / 1e6 if activity.get('price') else 0.5
-        
-        # Logique de determination du pari (YES/NO et Odds)
-        if outcome_prices and len(outcome_prices) >= 2:
-            yes_price = float(outcome_prices[0]) if outcome_prices[0] else 0.5
-            # no_price = float(outcome_prices[1]) if outcome_prices[1] else 0.5 # Unused
-            
-            # Si le prix de l'activité est cohérent (entre 0 et 1)
-            if 0 < price < 1:
-                outcome_odds = price
-                # Si on achete a ce prix, on parie sur l'outcome correspondant.
-                # Simplification: On assume souvent que c'est du Binary.
-                # Si price correspond au YES, c'est YES.
-                # Mais ici on garde la logique existante: on déduit le side.
-                # Pour faire simple et robuste:
-                bet_outcome = "YES" # Par defaut
-                # Si c'est un "Sell", c'est l'inverse, mais ici on scanne les "Buys" (activités positives)
-                # Amélioration: le scanner regarde les positions, donc c'est implicitement un "Hold/Buy"
-            else:
-                # Fallback sur les prix actuels
-                outcome_odds = yes_price
-                bet_outcome = "YES"
-        else:
-            outcome_odds = price if price > 0 else 0.5
-            bet_outcome = "YES"
-
-        # Verifier la deduplication
         dedup_key = self._generate_dedup_key(wallet, market_slug)
         if self._is_duplicate(dedup_key):
             return None
 
+        outcome_odds, bet_outcome = self._activity_odds(activity, market)
+
         # [MODIFIED] Detection par Triggers
-        active_triggers = self.detect_triggers(wallet, bet_amount, outcome_odds)
+        active_triggers = self.detect_triggers(wallet, bet_amount, outcome_odds, activity.get('condition_id', ''))
 
         if not active_triggers:
             return None
 
+        # Infos marche (uniquement pour les alertes)
+        market_question = market.get('question', 'Unknown Market')
+        token_id = activity.get('asset', {}).get('id', '') if isinstance(activity.get('asset'), dict) else ''
+
         # On prend le trigger le plus prioritaire/important comme type principal
         primary_trigger = active_triggers[0]
         
@@ -699,7 +1166,7 @@ class InsiderScanner:
         
         # Formater les details pour l'affichage humain
         trigger_desc = ", ".join([f"{t['label']} ({t['details']})" for t in active_triggers])
-        bet_desc = f"${bet_amount:.0f} sur {bet_outcome} @ {outcome_odds:.2f}"
+        bet_desc = f"${bet_amount:.0f} sur {bet_outcome}" + (f" @ {outcome_odds:.2f}" if outcome_odds is not None else "")
 
         # Calculer le score de suspicion basé sur les triggers
         suspicion_score = 50  # Base score
@@ -741,8 +1208,9 @@ class InsiderScanner:
             nickname=self.get_polymarket_username(wallet) or ""
         )
 
-        # Marquer comme vu
-        self.recent_alerts[dedup_key] = datetime.now()
+        # Marquer comme vu (en fin de file pour garder l'ordre chronologique)
+        self.recent_alerts[dedup_key] = time.monotonic()
+        self.recent_alerts.move_to_end(dedup_key)
 
         return alert
 
@@ -757,68 +1225,99 @@ class InsiderScanner:
         self._cleanup_old_snapshots()  # Nettoyage mémoire
 
         categories = self.config.get('categories', self.DEFAULT_CATEGORIES)
+        # Pre-filtre: seuil en unites brutes (USDC 6 decimales) calcule une fois par scan
+        min_amount_raw = self._min_alert_amount() * 1e6
+        min_profile_raw = self._min_profile_amount() * 1e6
         total_activities = 0
         total_markets_with_activity = 0
 
-        for category in categories:
-            try:
-                markets = self.get_markets_by_category(category, limit=30)
-                self.markets_scanned += len(markets)
+        # Pipeline: marches puis snapshots (requetes groupees) recuperes en parallele par categorie;
+        # chaque categorie est traitee des que ses snapshots arrivent, pendant que les autres se chargent.
+        # Le traitement des activites reste sequentiel (thread appelant).
+        with ThreadPoolExecutor(max_workers=self.SCAN_WORKERS, thread_name_prefix='insider-scan') as executor:
+            market_futures = {
+                category: executor.submit(self.get_markets_by_category, category, 30)
+                for category in categories
+            }
 
-                for market in markets:
-                    condition_id = market.get('conditionId', '')
-                    if not condition_id:
-                        continue
+            def fetch_category(category):
+                markets = market_futures[category].result()
+                activities_by_market = self.get_recent_market_activity_batch(
+                    [market.get('conditionId', '') for market in markets], limit=50
+                )
+                return markets, activities_by_market
+
+            category_futures = {executor.submit(fetch_category, category): category for category in categories}
+
+            for future in as_completed(category_futures):
+                category = category_futures[future]
+                try:
+                    markets, activities_by_market = future.result()
+                    self.markets_scanned += len(markets)
+
+                    # Profils Polygonscan des wallets concernes charges en parallele: detect_triggers lit le cache
+                    self._prefetch_wallet_profiles({
+                        a['user']
+                        for activities in activities_by_market.values()
+                        for a in activities
+                        if a.get('user') and a.get('amount', 0) >= min_profile_raw
+                    })
 
-                    # Recuperer l'activite recente sur ce marche
-                    activities = self.get_recent_market_activity(condition_id, limit=50)
+                    for market in markets:
+                        activities = activities_by_market.get(market.get('conditionId', ''), [])
                     
-                    if activities:
-                        total_markets_with_activity += 1
-                        total_activities += len(activities)
-
-                    for activity in activities:
-                        # Si on utilise 'positions' au lieu de 'activities', le type est implicite ou dans un autre champ
-                        # Pour le scanner insider, on s'interesse aux entrees
-                        alert = self.process_activity(activity, market)
-                        if alert:
-                            all_alerts.append(alert)
-                            self.alerts_generated += 1
-
-                            # Emettre via WebSocket (broadcast à tous les clients connectés)
-                            if self.socketio:
-                                try:
-                                    # 🔧 FIX: Utiliser emit avec namespace pour broadcast depuis thread
-                                    self.socketio.emit('insider_alert', alert.to_dict(), namespace='/')
-                                except Exception as ws_err:
-                                    logger.warning(f"WebSocket emit error: {ws_err}")
-
-                            # Sauvegarder en DB
-                            if self.db_manager:
-                                try:
-                                    print(f"💾 Saving alert for {alert.wallet_address} to DB...")
-                                    self.db_manager.save_insider_alert(alert.to_dict())
-                                    print("✅ Alert saved successfully")
-                                except Exception as e:
-                                    print(f"❌ Error saving alert to DB: {e}")
-                                    logger.error(f"Erreur sauvegarde alerte: {e}")
-                            else:
-                                print("❌ DB Manager is None in scanner!")
-
-                            # Notifier les callbacks
-                            for callback in self.callbacks:
-                                try:
-                                    callback(alert)
-                                except Exception as e:
-                                    logger.error(f"Callback error: {e}")
-
-                            logger.info(f"🚨 ALERT [{alert.alert_type}] {alert.wallet_address[:8]}... | {alert.bet_details} | {alert.trigger_details}")
-
-                    # Petit delai pour eviter rate limiting
-                    time.sleep(0.1)
+                        if activities:
+                            total_markets_with_activity += 1
+                            total_activities += len(activities)
+
+                        # Ignorer d'emblee les montants qui ne peuvent declencher aucun trigger
+                        candidates = [a for a in activities if a.get('amount', 0) >= min_amount_raw]
+
+                        for activity in candidates:
+                            # Si on utilise 'positions' au lieu de 'activities', le type est implicite ou dans un autre champ
+                            # Pour le scanner insider, on s'interesse aux entrees
+                            alert = self.process_activity(activity, market)
+                            if alert:
+                                all_alerts.append(alert)
+                                self.alerts_generated += 1
+                                alert_dict = alert.to_dict()  # Sérialisé une fois pour WebSocket + DB
+
+                                # Emettre via WebSocket (broadcast à tous les clients connectés)
+                                if self.socketio:
+                                    try:
+                                        # 🔧 FIX: Utiliser emit avec namespace pour broadcast depuis thread
+                                        self.socketio.emit('insider_alert', alert_dict, namespace='/')
+                                    except Exception as ws_err:
+                                        logger.warning(f"WebSocket emit error: {ws_err}")
+
+                                # Sauvegarder en DB
+                                if self.db_manager:
+                                    try:
+                                        print(f"💾 Saving alert for {alert.wallet_address} to DB...")
+                                        self.db_manager.save_insider_alert(alert_dict)
+                                        print("✅ Alert saved successfully")
+                                    except Exception as e:
+                                        print(f"❌ Error saving alert to DB: {e}")
+                                        logger.error(f"Erreur sauvegarde alerte: {e}")
+                                else:
+                                    print("❌ DB Manager is None in scanner!")
+
+                                # Notifier les callbacks
+                                for callback in self.callbacks:
+                                    try:
+                                        callback(alert)
+                                    except Exception as e:
+                                        logger.error(f"Callback error: {e}")
+
+                                logger.info(f"🚨 ALERT [{alert.alert_type}] {alert.wallet_address[:8]}... | {alert.bet_details} | {alert.trigger_details}")
+
+                        # Baseline mise a jour apres evaluation (une mise ne gonfle pas son propre seuil)
+                        self.record_market_amounts(
+                            market.get('conditionId', ''), [a.get('amount', 0) / 1e6 for a in activities]
+                        )
 
-            except Exception as e:
-                logger.error(f"❌ Erreur scan categorie {category}: {e}")
+                except Exception as e:
+                    logger.error(f"❌ Erreur scan categorie {category}: {e}")
 
         # Log résumé du scan
         if total_activities > 0:
@@ -853,6 +1352,9 @@ class InsiderScanner:
                     if alerts:
                         logger.info(f"📊 {len(alerts)} alerte(s) generee(s)")
 
+                    # Persister snapshots + dedup pour un redemarrage a chaud
+                    self.save_state_to_file()
+
                     # Cleanup DB toutes les 100 scans (~50 min si interval=30s)
                     scan_count += 1
                     if scan_count % 100 == 0 and self.db_manager:
@@ -872,43 +1374,59 @@ class InsiderScanner:
         
         # Persist state
         self.config['auto_start'] = False
-        self.save_config_to_file()
+        self.flush_config()
+        self.save_state_to_file()
         
         logger.info("🛑 Insider Scanner arrete")
 
     def get_polymarket_username(self, address: str) -> Optional[str]:
-        """Récupère le pseudonyme/name Polymarket pour une adresse donnée"""
+        """
+        Récupère le pseudonyme/name Polymarket pour une adresse donnée.
+        Cache positif 24h; cache négatif 1h uniquement pour un profil sans nom ou absent (404),
+        les erreurs transitoires (exception, 429, 5xx) ne sont pas mémorisées.
+        """
+        address = address.lower()
+        username = self._username_cache.get(address)
+        if username is not None or self._username_misses.get(address):
+            return username
+
         try:
-            url = f"https://gamma-api.polymarket.com/public-profile?address={address.lower()}"
-            response = requests.get(url, timeout=5)
+            url = f"{self.GAMMA_API}/public-profile?address={address}"
+            response = self._gamma_get(url, timeout=5)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 # On priorise 'name' (nickname choisi par l'user) puis 'pseudonym'
-                return data.get('name') or data.get('pseudonym')
+                username = data.get('name') or data.get('pseudonym')
+                if username:
+                    self._username_cache.set(address, username)
+                    return username
+                self._username_misses.set(address, True)  # Profil sans nom
+            elif response.status_code == 404:
+                self._username_misses.set(address, True)  # Pas de profil Polymarket
         except Exception as e:
+            # Erreur transitoire (timeout, JSON invalide...): pas de cache négatif
             logger.error(f"⚠️ Erreur récupération username pour {address}: {e}")
         return None
 
     def get_market_info(self, token_id: str) -> Dict:
         """Recupere les infos d'un marche via Gamma API (Cache 1h)"""
         addr_lower = token_id.lower()
-        if addr_lower in self._market_cache:
-            cached = self._market_cache[addr_lower]
-            if (datetime.now() - cached['timestamp']).total_seconds() < 3600:
-                return cached['data']
+        cached = self._market_cache.get(addr_lower)
+        if cached is not None:
+            return cached
 
         try:
             # On cherche par token_id (assetId sur Gamma)
             # Normalement l'API Gamma permet de chercher un marché par un de ses tokens
-            resp = requests.get(f"{self.GAMMA_API}/markets/{token_id}", timeout=5)
+            resp = self._gamma_get(f"{self.GAMMA_API}/markets/{token_id}", timeout=5)
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 market_info = {
                     'question': data.get('question', 'Marche inconnu'),
                     'slug': data.get('slug', ''),
                     'price': data.get('outcomePrices', [0, 0])[0] # Prix indicatif
                 }
-                self._market_cache[addr_lower] = {'data': market_info, 'timestamp': datetime.now()}
+                self._market_cache.set(addr_lower, market_info)
                 return market_info
         except:
             pass
@@ -917,31 +1435,17 @@ class InsiderScanner:
 
     def get_wallet_positions(self, address: str) -> List[Dict]:
         """Recupere les positions d'un wallet via Goldsky (Schema 0.0.7)"""
-        # Note: balance_gt attend souvent une chaine pour les BigInt dans Goldsky
-        query = """
-        {
-          userBalances(first: 100, where: {user: "%s", balance_gt: "0"}) {
-            id
-            balance
-            asset {
-              id
-              condition {
-                id
-              }
-            }
-          }
-        }
-        """ % address.lower()
+        payload = _json_dumps({'query': self._WALLET_POSITIONS_QUERY, 'variables': {'user': address.lower()}})
 
         try:
             # Rate limiter
             rate_limiter = get_goldsky_rate_limiter()
             rate_limiter.wait_for_slot(Priority.INSIDER)
 
-            resp = requests.post(self.GOLDSKY_POSITIONS, json={'query': query}, timeout=10)
+            resp = self.session.post(self.GOLDSKY_POSITIONS, data=payload, timeout=10)
             if resp.status_code == 200:
                 rate_limiter.report_success()
-                data = resp.json()
+                data = _json_loads(resp.content)
                 return data.get('data', {}).get('userBalances', [])
             elif resp.status_code == 429:
                 rate_limiter.report_rate_limit()
@@ -964,9 +1468,10 @@ class InsiderScanner:
                 'sort': 'desc',
                 'apikey': self.polygonscan_api_key
             }
-            resp = requests.get(self.POLYGONSCAN_API, params=params, timeout=10)
+            self._polygonscan_bucket.acquire()
+            resp = self.session.get(self.POLYGONSCAN_API, params=params, timeout=10)
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 if data.get('status') == '1':
                     return data.get('result', [])
         except Exception as e:
@@ -986,31 +1491,16 @@ class InsiderScanner:
         }
 
         # Calcul PnL et Winrate basique sur les positions actuelles
-        total_cost = 0
-        total_value = 0
-        wins = 0
-        
-        for pos in positions:
-            # Goldsky balance est en 1e6 (USDC)
-            balance = float(pos.get('balance', 0)) / 1e6
-            asset_id = pos.get('asset', {}).get('id')
-            
-            # Puisque 'cost' n'est plus dans le subgraph, on fait une estimation 
-            # ou on affiche au moins la valeur actuelle
-            cost = 0 # On ne peut plus le savoir directement via ce subgraph
-            
-            if balance > 0.01:
-                stats['total_trades'] += 1
-                
-                # Optionnel: Chercher le nom du marché pour enrichir (utile pour le logging/UI plus tard)
-                # market_info = self.get_market_info(asset_id)
-                
-                total_value += balance
-                # Sans cost, on ne peut pas vraiment calculer PnL/Winrate precision
-                # Mais on peut considerer que si balance > 0, c'est une position active
-                # Pour eviter les 0 partout, on va au moins montrer le PnL non-realise indicatif
-                # Si on n'a pas le cost, on met le PnL à 0 mais on garde le total_value
-        
+        # Goldsky balance est en 1e6 (USDC). Puisque 'cost' n'est plus dans le subgraph,
+        # on ne peut pas calculer PnL/Winrate avec precision: on agrege la valeur des
+        # positions actives (> 0.01) en une seule passe (len + sum, boucles C).
+        live_balances = [
+            balance for balance in (float(pos.get('balance', 0)) / 1e6 for pos in positions)
+            if balance > 0.01
+        ]
+        stats['total_trades'] = len(live_balances)
+        total_value = sum(live_balances)
+
         # Pour l'instant, on retourne au moins quelque chose si des positions existent
         # Si vous voulez un vrai PnL, il faudrait scanner l'historique complet des trades
         stats['pnl'] = round(total_value, 2) # On affiche la valeur totale pour l'instant
@@ -1030,10 +1520,14 @@ class InsiderScanner:
     def _scan_specific_wallet(self, wallet_address: str):
         """Scanne un wallet spécifique et met à jour ses stats en DB"""
         try:
-            # 1. Recuperer les donnees
-            last_activity = self.get_wallet_last_activity(wallet_address)
-            positions = self.get_wallet_positions(wallet_address)
-            tx_history = self.get_wallet_tx_history(wallet_address)
+            # 1. Recuperer les donnees (3 sources independantes, en parallele: latence = la plus lente)
+            with ThreadPoolExecutor(max_workers=3, thread_name_prefix='insider-wallet') as executor:
+                activity_future = executor.submit(self.get_wallet_last_activity, wallet_address)
+                positions_future = executor.submit(self.get_wallet_positions, wallet_address)
+                history_future = executor.submit(self.get_wallet_tx_history, wallet_address)
+            last_activity = activity_future.result()
+            positions = positions_future.result()
+            tx_history = history_future.result()
             
             # 2. Analyser
             stats = self._analyze_wallet_stats(wallet_address, positions, last_activity, tx_history)
@@ -5,11 +5,14 @@ Détecte les trades des wallets suivis en <1 seconde via Alchemy/Infura WebSocke
 """
 import os
 import json
+import random
 import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Callable, Optional
 from datetime import datetime
+from collections import OrderedDict
 
 # WebSocket
 try:
@@ -19,11 +22,28 @@ except ImportError:
     WEBSOCKET_AVAILABLE = False
     print("⚠️ Module websocket-client non installé. pip install websocket-client")
 
+# Parser JSON rapide (optionnel, fallback sur json standard)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 import requests
+from requests.adapters import HTTPAdapter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("PolygonWebSocket")
 
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 
 class PolygonWebSocket:
     """
@@ -31,6 +51,8 @@ class PolygonWebSocket:
     Utilise Alchemy ou Infura pour les événements on-chain.
     """
 
+    POLYGONSCAN_API = "https://api.polygonscan.com/api"
+
     # Contrats Polymarket connus sur Polygon
     POLYMARKET_CONTRACTS = {
         'CTF_EXCHANGE': '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'.lower(),
@@ -38,6 +60,17 @@ class PolygonWebSocket:
         'CONDITIONAL_TOKENS': '0x4D97DCd97eC945f40cF65F87097ACe5EA0476045'.lower(),
         'USDC_POLYGON': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'.lower(),
     }
+    # Ensemble figé pour les tests d'appartenance (O(1) au lieu d'un scan de dict.values())
+    POLYMARKET_CONTRACT_SET = frozenset(POLYMARKET_CONTRACTS.values())
+
+    # Nombre de hash de TX mémorisés pour le dédoublonnage du polling
+    MAX_PROCESSED_TXS = 4096
+
+    # Polling adaptatif: wallets actifs toutes les 10s, wallets inactifs jusqu'à 120s
+    POLL_INTERVAL_MIN = 10
+    POLL_INTERVAL_MAX = 120
+    # Workers pour poller plusieurs wallets en parallèle (Polygonscan: ~5 req/s)
+    POLL_WORKERS = 4
 
     def __init__(self):
         self.ws = None
@@ -48,20 +81,57 @@ class PolygonWebSocket:
         self.reconnect_delay = 5
         self.max_reconnect_delay = 60
 
+        # Dédoublonnage global des TX pollées (LRU, partagé entre tous les wallets)
+        self._processed_txs: OrderedDict = OrderedDict()
+        self._processed_lock = threading.Lock()
+        self._poll_executor: Optional[ThreadPoolExecutor] = None
+
+        # Polling adaptatif par wallet (prochaine échéance + nb de polls sans activité)
+        self._next_poll_at: Dict[str, float] = {}
+        self._idle_streak: Dict[str, int] = {}
+
+        # Rate limit Polygonscan: pause globale du polling (horloge monotone)
+        self._rate_limited_until = 0.0
+        self._rate_limit_hits = 0
+
+        # Compteurs, planning et rate limit modifiés par les workers de polling
+        self._stats_lock = threading.Lock()
+
         # Stats
         self.events_received = 0
         self.trades_detected = 0
         self.last_event_time = None
         self.connected = False
+        self._subscribed = False
 
         # API Keys
         self.alchemy_api_key = os.getenv('ALCHEMY_API_KEY', '')
         self.infura_api_key = os.getenv('INFURA_API_KEY', '')
         self.polygonscan_api_key = os.getenv('POLYGONSCAN_API_KEY', '')
 
+        # Paramètres Polygonscan constants (seule l'adresse change d'un poll à l'autre)
+        self._poll_params = {
+            'module': 'account',
+            'action': 'tokentx',
+            'page': 1,
+            'offset': 10,
+            'sort': 'desc',
+            'apikey': self.polygonscan_api_key
+        }
+
         # Choisir le provider
         self.ws_url = self._get_ws_url()
 
+        # Session HTTP keep-alive partagée par les workers de polling (évite un handshake TLS par requête).
+        # Un seul hôte (Polygonscan): une connexion gardée ouverte par worker.
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=self.POLL_WORKERS, max_retries=0))
+        self.session.headers.update({
+            'User-Agent': 'bot-du-millionaire/polygon-poller',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
         logger.info("🔌 PolygonWebSocket initialisé")
         if self.ws_url:
             logger.info(f"   Provider: {'Alchemy' if 'alchemy' in self.ws_url else 'Infura' if 'infura' in self.ws_url else 'Public'}")
@@ -83,20 +153,28 @@ class PolygonWebSocket:
         self.tracked_wallets.add(address.lower())
         logger.info(f"👁️ Wallet ajouté au WebSocket: {address[:10]}...")
 
-        # Si WebSocket actif, mettre à jour les subscriptions
-        if self.running and self.ws:
-            self._subscribe_to_wallet(address)
+        # La subscription filtre par contrat (pas par wallet): une seule suffit pour tous
+        if self.running and self.connected and not self._subscribed:
+            self._subscribe_to_contracts()
 
     def remove_wallet(self, address: str):
         """Retire un wallet de la surveillance"""
-        self.tracked_wallets.discard(address.lower())
+        address = address.lower()
+        self.tracked_wallets.discard(address)
+        with self._stats_lock:
+            self._next_poll_at.pop(address, None)
+            self._idle_streak.pop(address, None)
 
     def add_callback(self, callback: Callable):
-        """Ajoute un callback appelé lors de la détection d'un trade"""
+        """
+        Ajoute un callback appelé lors de la détection d'un trade.
+        En mode polling, les callbacks sont appelés depuis les POLL_WORKERS threads en parallèle:
+        ils doivent être thread-safe.
+        """
         self.callbacks.append(callback)
 
-    def _subscribe_to_wallet(self, address: str):
-        """Souscrit aux événements pour un wallet spécifique"""
+    def _subscribe_to_contracts(self):
+        """Souscrit aux logs des contrats Polymarket (filtrage des wallets côté client)"""
         if not self.ws:
             return
 
@@ -118,14 +196,15 @@ class PolygonWebSocket:
         }
 
         try:
-            self.ws.send(json.dumps(subscription))
+            self.ws.send(_json_dumps(subscription))
+            self._subscribed = True
         except Exception as e:
             logger.error(f"❌ Erreur subscription: {e}")
 
     def _on_message(self, ws, message):
         """Callback lors de la réception d'un message WebSocket"""
         try:
-            data = json.loads(message)
+            data = _json_loads(message)
             self.events_received += 1
             self.last_event_time = datetime.now()
 
@@ -151,7 +230,7 @@ class PolygonWebSocket:
             data = log.get('data', '')
 
             # Vérifier si c'est un contrat Polymarket
-            if address not in self.POLYMARKET_CONTRACTS.values():
+            if address not in self.POLYMARKET_CONTRACT_SET:
                 return
 
             # Extraire les adresses des topics
@@ -166,7 +245,8 @@ class PolygonWebSocket:
             matched_wallets = involved_addresses.intersection(self.tracked_wallets)
 
             if matched_wallets:
-                self.trades_detected += 1
+                with self._stats_lock:
+                    self.trades_detected += 1
 
                 # Créer l'événement
                 event = {
@@ -199,11 +279,14 @@ class PolygonWebSocket:
         """Callback lors de la fermeture du WebSocket"""
         logger.warning(f"🔌 WebSocket fermé: {close_status_code} - {close_msg}")
         self.connected = False
+        self._subscribed = False
 
         # Reconnexion automatique si toujours en cours d'exécution
         if self.running:
-            logger.info(f"⏳ Reconnexion dans {self.reconnect_delay}s...")
-            time.sleep(self.reconnect_delay)
+            # Jitter: évite les reconnexions synchronisées après une coupure du provider
+            delay = self.reconnect_delay + random.uniform(0, self.reconnect_delay / 2)
+            logger.info(f"⏳ Reconnexion dans {delay:.1f}s...")
+            time.sleep(delay)
             self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
             self._connect()
 
@@ -213,9 +296,10 @@ class PolygonWebSocket:
         self.connected = True
         self.reconnect_delay = 5  # Reset delay
 
-        # Souscrire aux événements pour tous les wallets
-        for wallet in self.tracked_wallets:
-            self._subscribe_to_wallet(wallet)
+        # Une seule subscription (identique pour tous les wallets)
+        self._subscribed = False
+        if self.tracked_wallets:
+            self._subscribe_to_contracts()
 
     def _connect(self):
         """Établit la connexion WebSocket"""
@@ -264,67 +348,125 @@ class PolygonWebSocket:
         self.running = False
         if self.ws:
             self.ws.close()
+        if self._poll_executor:
+            self._poll_executor.shutdown(wait=False)
+            self._poll_executor = None
+        self.session.close()
         logger.info("🛑 WebSocket Polygon arrêté")
 
     def _start_polling(self):
         """Mode fallback: polling via Polygonscan API"""
+        executor = ThreadPoolExecutor(max_workers=self.POLL_WORKERS, thread_name_prefix='polygon-poll')
+        self._poll_executor = executor
+
         def poll_loop():
             while self.running:
-                for wallet in list(self.tracked_wallets):
+                now = time.monotonic()
+                if now < self._rate_limited_until:
+                    time.sleep(1)
+                    continue
+                due = [w for w in list(self.tracked_wallets) if now >= self._next_poll_at.get(w, 0)]
+                if due:
                     try:
-                        self._poll_wallet_transactions(wallet)
-                    except Exception as e:
-                        logger.error(f"❌ Erreur polling {wallet[:10]}: {e}")
-                time.sleep(10)  # Poll toutes les 10 secondes
+                        # Pool persistant: les wallets dus sont pollés en parallèle
+                        list(executor.map(self._poll_and_schedule, due))
+                    except RuntimeError:
+                        break  # Executor arrêté par stop()
+                time.sleep(1)
 
         poll_thread = threading.Thread(target=poll_loop, daemon=True)
         poll_thread.start()
 
-    def _poll_wallet_transactions(self, wallet: str):
-        """Récupère les transactions récentes d'un wallet via Polygonscan"""
+    def _poll_and_schedule(self, wallet: str):
+        """Polle un wallet puis planifie son prochain passage"""
+        try:
+            new_txs = self._poll_wallet_transactions(wallet)
+        except Exception as e:
+            logger.error(f"❌ Erreur polling {wallet[:10]}: {e}")
+            new_txs = 0
+        self._schedule_next_poll(wallet, new_txs)
+
+    def _schedule_next_poll(self, wallet: str, new_txs: int):
+        """Planifie le prochain poll: intervalle minimal si activité, backoff exponentiel sinon"""
+        with self._stats_lock:
+            if new_txs > 0:
+                self._idle_streak[wallet] = 0
+                interval = self.POLL_INTERVAL_MIN
+            else:
+                streak = self._idle_streak.get(wallet, 0) + 1
+                self._idle_streak[wallet] = streak
+                interval = min(self.POLL_INTERVAL_MAX, self.POLL_INTERVAL_MIN * 2 ** streak)
+            self._next_poll_at[wallet] = time.monotonic() + interval
+
+    def _poll_wallet_transactions(self, wallet: str) -> int:
+        """Récupère les transactions récentes d'un wallet via Polygonscan (retourne le nb de nouvelles TX)"""
         if not self.polygonscan_api_key:
-            return
+            return 0
 
-        url = f"https://api.polygonscan.com/api"
-        params = {
-            'module': 'account',
-            'action': 'tokentx',
-            'address': wallet,
-            'page': 1,
-            'offset': 10,
-            'sort': 'desc',
-            'apikey': self.polygonscan_api_key
-        }
+        params = {**self._poll_params, 'address': wallet}
 
+        new_txs = 0
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self.session.get(self.POLYGONSCAN_API, params=params, timeout=10)
+            if resp.status_code == 429:
+                self._backoff_rate_limit(resp.headers.get('Retry-After'))
+                return 0
             if resp.status_code == 200:
-                data = resp.json()
+                # Réponse gzip décompressée par urllib3, parsée avec orjson si disponible
+                data = _json_loads(resp.content)
+                logger.debug(f"Polygonscan {wallet[:10]}: {len(resp.content)} octets décodés")
+                # Polygonscan signale aussi le rate limit en HTTP 200 (status '0')
+                if data.get('status') == '0' and 'rate limit' in str(data.get('result', '')).lower():
+                    self._backoff_rate_limit(None)
+                    return 0
+                with self._stats_lock:
+                    self._rate_limit_hits = 0
                 if data.get('status') == '1' and data.get('result'):
                     for tx in data['result']:
                         # Vérifier si c'est une interaction Polymarket
                         contract = tx.get('contractAddress', '').lower()
-                        if contract in self.POLYMARKET_CONTRACTS.values():
-                            self._handle_polled_transaction(wallet, tx)
+                        if contract in self.POLYMARKET_CONTRACT_SET:
+                            if self._handle_polled_transaction(wallet, tx):
+                                new_txs += 1
         except Exception as e:
             logger.error(f"❌ Erreur Polygonscan API: {e}")
+        return new_txs
+
+    def _backoff_rate_limit(self, retry_after: Optional[str]):
+        """Suspend le polling: Retry-After si fourni, sinon backoff exponentiel, avec jitter"""
+        with self._stats_lock:
+            self._rate_limit_hits += 1
+            hits = self._rate_limit_hits
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = 2 ** hits
+            # Jitter pour éviter que tous les workers ne relancent au même instant
+            delay = min(delay + random.uniform(0, 0.5 * hits), 30)
+            self._rate_limited_until = max(self._rate_limited_until, time.monotonic() + delay)
+        logger.warning(f"⏳ Rate limit Polygonscan, pause du polling {delay:.1f}s")
+
+    def _seen_tx(self, tx_hash: str) -> bool:
+        """Retourne True si la TX a déjà été traitée, sinon l'enregistre (LRU borné)"""
+        with self._processed_lock:
+            if tx_hash in self._processed_txs:
+                self._processed_txs.move_to_end(tx_hash)
+                return True
+            self._processed_txs[tx_hash] = None
+            if len(self._processed_txs) > self.MAX_PROCESSED_TXS:
+                self._processed_txs.popitem(last=False)
+            return False
 
-    def _handle_polled_transaction(self, wallet: str, tx: Dict):
-        """Traite une transaction récupérée par polling"""
+    def _handle_polled_transaction(self, wallet: str, tx: Dict) -> bool:
+        """Traite une transaction récupérée par polling (retourne False si déjà vue)"""
         tx_hash = tx.get('hash', '')
 
-        # Éviter les doublons
-        if hasattr(self, '_processed_txs'):
-            if tx_hash in self._processed_txs:
-                return
-            self._processed_txs.add(tx_hash)
-            # Limiter la taille du set
-            if len(self._processed_txs) > 1000:
-                self._processed_txs = set(list(self._processed_txs)[-500:])
-        else:
-            self._processed_txs = {tx_hash}
+        # Éviter les doublons (une même TX peut remonter pour plusieurs wallets)
+        if self._seen_tx(tx_hash):
+            return False
 
-        self.trades_detected += 1
+        with self._stats_lock:
+            self.trades_detected += 1
 
         event = {
             'type': 'TRADE_DETECTED',
@@ -341,12 +483,15 @@ class PolygonWebSocket:
 
         logger.info(f"📡 [POLL] Trade détecté: {tx_hash[:20]}...")
 
+        # Appelé depuis un worker de polling: les callbacks peuvent s'exécuter en parallèle
         for callback in self.callbacks:
             try:
                 callback(event)
             except Exception as e:
                 logger.error(f"❌ Erreur callback: {e}")
 
+        return True
+
     def get_stats(self) -> Dict:
         """Retourne les statistiques du WebSocket"""
         return {
@@ -37,6 +37,8 @@ class PolymarketTracker:
         'CONDITIONAL_TOKENS': '0x4D97DCd97eC945f40cF65F87097ACe5EA0476045',
         'USDC_POLYGON': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
     }
+    # Adresses en minuscules, figées une fois pour toutes (lookup O(1) par transaction)
+    POLYMARKET_CONTRACT_SET = frozenset(c.lower() for c in POLYMARKET_CONTRACTS.values())
 
     def __init__(self, socketio=None):
         self.tracked_wallets = {}  # {address: {name, capital, percent, ...}}
@@ -137,7 +139,8 @@ class PolymarketTracker:
 
     def detect_position_changes(self, address: str) -> List[Dict]:
         """Détecte les changements de position pour un wallet donné."""
-        current_positions = self.get_user_positions(address)
+        addr = address.lower()  # Forme canonique calculée une seule fois
+        current_positions = self.get_user_positions(addr)
 
         # Convertir en dictionnaire {asset_id: balance}
         current_map = {}
@@ -146,18 +149,20 @@ class PolymarketTracker:
             if asset_id:
                 current_map[asset_id] = int(p.get('balance', 0))
 
-        wallet_info = self.tracked_wallets.get(address.lower(), {})
+        wallet_info = self.tracked_wallets.get(addr, {})
 
         # ✨ INITIAL SNAPSHOT: Si c'est la première fois qu'on scanne ce wallet,
         # on enregistre l'état actuel sans déclencher d'alertes (pour éviter le spam au démarrage)
-        if address.lower() not in self.last_positions:
-            self.last_positions[address.lower()] = current_map
+        if addr not in self.last_positions:
+            self.last_positions[addr] = current_map
             if current_map:
                 logger.info(f"📸 Snapshot initial pour {wallet_info.get('name', 'Wallet')} ({len(current_map)} positions)")
             return []
 
-        last_map = self.last_positions.get(address.lower(), {})
+        last_map = self.last_positions.get(addr, {})
         changes = []
+        # Horodatage unique du snapshot, partagé par tous les changements détectés
+        detected_at = datetime.now().isoformat()
 
         # Détecter ACHATS (nouvelles positions ou augmentations)
         for asset_id, balance in current_map.items():
@@ -186,7 +191,7 @@ class PolymarketTracker:
                     "capital_allocated": wallet_info.get('capital_allocated', 0),
                     "percent_per_trade": wallet_info.get('percent_per_trade', 0),
                     "use_kelly": wallet_info.get('use_kelly', False), # ✨ Config Kelly
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": detected_at,
                     "source": "goldsky"
                 })
 
@@ -209,12 +214,12 @@ class PolymarketTracker:
                     "value_usd": amount_norm * market_info.get('yes_price', 0.5),
                     "remaining_balance": balance_norm,
                     "market": market_info,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": detected_at,
                     "source": "goldsky"
                 })
 
         # Mettre à jour l'état
-        self.last_positions[address.lower()] = current_map
+        self.last_positions[addr] = current_map
         return changes
 
     # =========================================================================
@@ -280,16 +285,17 @@ class PolymarketTracker:
         transactions = self.get_recent_transactions(address, limit=50)
         polymarket_txs = []
 
-        contract_addresses = [c.lower() for c in self.POLYMARKET_CONTRACTS.values()]
-        wallet_info = self.tracked_wallets.get(address.lower(), {})
-        last_tx = self.last_transactions.get(address.lower(), '')
+        addr = address.lower()
+        contract_addresses = self.POLYMARKET_CONTRACT_SET
+        wallet_info = self.tracked_wallets.get(addr, {})
+        last_tx = self.last_transactions.get(addr, '')
 
         for tx in transactions:
             # Arrêter si on a déjà vu cette transaction
             if tx.get('hash') == last_tx:
                 break
 
-            to_addr = tx.get('to', '').lower()
+            to_addr = (tx.get('to') or '').lower()
             if to_addr in contract_addresses:
                 polymarket_txs.append({
                     'type': 'TRANSACTION',
@@ -306,7 +312,7 @@ class PolymarketTracker:
 
         # Mettre à jour le dernier hash vu
         if transactions:
-            self.last_transactions[address.lower()] = transactions[0].get('hash', '')
+            self.last_transactions[addr] = transactions[0].get('hash', '')
 
         return polymarket_txs
 
@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_manager import DBManager
+
+class TestPriceUpdateBatching(unittest.TestCase):
+    def setUp(self):
+        self.db = DBManager(':memory:')
+        self.db.PRICE_FLUSH_INTERVAL = 60  # Flush piloté par le test uniquement
+        self.pos_id = self.db.add_position({
+            'token_id': 'tok1', 'source_wallet': '0xabc', 'market_slug': 'market-1',
+            'shares': 10, 'size': 10, 'avg_price': 0.5, 'entry_price': 0.5
+        })
+
+    def _current_price(self):
+        return self.db.get_position_by_id(self.pos_id)['current_price']
+
+    def test_updates_are_coalesced_until_flush(self):
+        """Les mises à jour de prix restent en mémoire jusqu'au flush, seule la dernière est écrite"""
+        self.db.update_position_price(self.pos_id, 0.6, 1.0)
+        self.db.update_position_price(self.pos_id, 0.7, 2.0)
+        self.assertEqual(self.db.flush_price_updates(), 1)
+
+        self.assertAlmostEqual(self._current_price(), 0.7)
+        self.assertEqual(self.db.flush_price_updates(), 0)
+
+    def test_close_position_flushes_pending_price(self):
+        """La fermeture d'une position rend durable le dernier prix connu"""
+        self.db.update_position_price(self.pos_id, 0.4, -1.0)
+        self.db.close_position(self.pos_id, realized_pnl=-1.0, status='CLOSED_SL')
+
+        position = self.db.get_position_by_id(self.pos_id)
+        self.assertAlmostEqual(position['current_price'], 0.4)
+        self.assertEqual(position['status'], 'CLOSED_SL')
+
+class TestHFTTradesBatch(unittest.TestCase):
+    def test_batch_insert(self):
+        """Un batch de trades HFT est écrit en une transaction"""
+        db = DBManager(':memory:')
+        trades = [
+            {'token_id': f'tok{i}', 'side': 'BUY', 'execution_price': 0.5, 'status': 'executed'}
+            for i in range(3)
+        ]
+        self.assertEqual(db.save_hft_trades_batch(trades), 3)
+        self.assertEqual(db.save_hft_trades_batch([]), 0)
+        self.assertEqual(len(db.get_hft_trades()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
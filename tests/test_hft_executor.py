@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hft_module.hft_executor import HFTExecutor, compute_order_params
+
+class TestComputeOrderParams(unittest.TestCase):
+    def test_buy_with_slippage(self):
+        """Prix limite majoré du slippage, shares arrondies à 2 décimales"""
+        limit_price, shares = compute_order_params(0.5, 10.0, 1.005)
+        self.assertAlmostEqual(limit_price, 0.5025)
+        self.assertAlmostEqual(shares, 19.9)
+
+    def test_invalid_price_gives_zero_shares(self):
+        """Un prix limite nul ne doit pas produire de shares"""
+        self.assertEqual(compute_order_params(0.0, 10.0, 1.005), (0.0, 0.0))
+
+class TestBestPrice(unittest.TestCase):
+    def test_top_of_book_is_cached(self):
+        """Deux lectures rapprochées du même token ne refont qu'un fetch du carnet"""
+        client = MagicMock()
+        client.get_order_book.return_value = {
+            'bids': [{'price': '0.40'}, {'price': '0.45'}],
+            'asks': [{'price': '0.55'}, {'price': '0.50'}],
+        }
+        executor = HFTExecutor(polymarket_client=client)
+
+        self.assertAlmostEqual(executor.get_best_price('tok1', 'BUY'), 0.50)
+        self.assertAlmostEqual(executor.get_best_price('tok1', 'SELL'), 0.45)
+        self.assertEqual(client.get_order_book.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
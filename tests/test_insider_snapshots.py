@@ -0,0 +1,190 @@
+import unittest
+import json
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+import time
+import threading
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insider_scanner import InsiderScanner
+
+def _balances_response(aliases):
+    return MagicMock(status_code=200, content=json.dumps({'data': aliases}).encode())
+
+class _IsolatedScannerTestCase(unittest.TestCase):
+    """Config et état du scanner redirigés vers un dossier temporaire (rien n'est lu depuis le disque du repo)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        for attr, name in (('STATE_FILE', 'state.json'), ('CONFIG_FILE', 'config.json')):
+            patcher = patch.object(InsiderScanner, attr, os.path.join(self.tmp, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+class TestBatchedSnapshots(_IsolatedScannerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.scanner = InsiderScanner()
+        self.scanner.session = MagicMock()
+
+    def test_batch_diffs_each_market_snapshot(self):
+        """Une requête aliasée alimente le snapshot de chaque marché, un alias manquant = échec"""
+        mock_post = self.scanner.session.post
+        mock_post.return_value = _balances_response({
+            'm0': [{'user': '0xaaa', 'balance': '1000000'}],
+            'm1': [],
+        })
+        first = self.scanner.get_recent_market_activity_batch(['c0', 'c1', 'c2'])
+        self.assertEqual(first, {'c0': [], 'c1': []})
+        self.assertNotIn('c2', self.scanner._market_snapshots)
+
+        mock_post.return_value = _balances_response({
+            'm0': [{'user': '0xaaa', 'balance': '3000000'}],
+            'm1': [{'user': '0xbbb', 'balance': '5000000'}],
+        })
+        second = self.scanner.get_recent_market_activity_batch(['c0', 'c1'])
+
+        self.assertEqual(mock_post.call_count, 2)
+        payload = json.loads(mock_post.call_args.kwargs['data'])
+        self.assertEqual(payload['variables'], {'c0': 'c0', 'c1': 'c1', 'limit': 300})
+        self.assertEqual([a['amount'] for a in second['c0']], [2000000.0])
+        self.assertEqual([a['user'] for a in second['c1']], ['0xbbb'])
+
+    def test_snapshots_are_capped_lru(self):
+        """Au-delà de MAX_MARKET_SNAPSHOTS, le marché le moins récemment scanné est évincé"""
+        self.scanner.MAX_MARKET_SNAPSHOTS = 2
+        for cid in ('c0', 'c1', 'c0', 'c2'):
+            self.scanner._diff_market_snapshot(cid, {})
+        self.assertEqual(list(self.scanner._market_snapshots), ['c0', 'c2'])
+
+class TestGammaRateLimit(_IsolatedScannerTestCase):
+    @patch('insider_scanner.time.sleep')
+    def test_retry_after_is_honoured(self, mock_sleep):
+        """Un 429 Gamma attend Retry-After (plafonné) puis réessaie"""
+        limited = MagicMock(status_code=429, headers={'Retry-After': '120'})
+        ok = MagicMock(status_code=200)
+
+        scanner = InsiderScanner()
+        scanner.session = MagicMock()
+        scanner.session.get.side_effect = [limited, ok]
+        self.assertIs(scanner._gamma_get('https://gamma.test/markets'), ok)
+
+        delay = mock_sleep.call_args[0][0]
+        self.assertGreaterEqual(delay, scanner.RETRY_AFTER_MAX_SEC)
+        self.assertLess(delay, scanner.RETRY_AFTER_MAX_SEC + 0.5)
+
+    def test_username_lookups_are_cached(self):
+        """Pseudonyme mis en cache (adresse normalisée), seul un profil sans nom est mémorisé en négatif"""
+        scanner = InsiderScanner()
+        scanner.session = MagicMock()
+        scanner.session.get.side_effect = [
+            MagicMock(status_code=200, content=b'{"name": "whale"}'),
+            MagicMock(status_code=200, content=b'{}'),
+            MagicMock(status_code=500),
+            MagicMock(status_code=200, content=b'{"pseudonym": "late"}'),
+        ]
+
+        self.assertEqual(scanner.get_polymarket_username('0xAAA'), 'whale')
+        self.assertEqual(scanner.get_polymarket_username('0xaaa'), 'whale')
+        self.assertIsNone(scanner.get_polymarket_username('0xbbb'))
+        self.assertIsNone(scanner.get_polymarket_username('0xbbb'))
+        self.assertEqual(scanner.session.get.call_count, 2)
+
+        # Erreur transitoire: non mémorisée, l'appel suivant réinterroge Gamma
+        self.assertIsNone(scanner.get_polymarket_username('0xccc'))
+        self.assertEqual(scanner.get_polymarket_username('0xccc'), 'late')
+
+class TestRollingBaseline(_IsolatedScannerTestCase):
+    def test_high_stake_threshold_follows_market_baseline(self):
+        """Seuil statique sur marché froid, moyenne + 3σ une fois la baseline remplie"""
+        scanner = InsiderScanner()
+        self.assertEqual(scanner._high_stake_threshold('c0'), scanner.config['risky_bet']['high_amount'])
+
+        scanner.record_market_amounts('c0', [100.0, 300.0] * 10)
+        self.assertAlmostEqual(scanner._high_stake_threshold('c0'), 200.0 + 3 * 100.0)
+
+class TestStatePersistence(_IsolatedScannerTestCase):
+    def test_snapshots_survive_restart(self):
+        """Les snapshots et la dedup sauvegardés sont rechargés par une nouvelle instance"""
+        scanner = InsiderScanner()
+        scanner._diff_market_snapshot('c0', {'0xaaa': 1000000.0})
+        scanner.recent_alerts['0xaaa_market'] = time.monotonic()
+        scanner.save_state_to_file()
+
+        restarted = InsiderScanner()
+        activities = restarted._diff_market_snapshot('c0', {'0xaaa': 4000000.0})
+
+        self.assertEqual([a['amount'] for a in activities], [3000000.0])
+        self.assertTrue(restarted._is_duplicate('0xaaa_market'))
+
+    def test_concurrent_atomic_writes(self):
+        """Des écritures concurrentes du même fichier laissent un contenu complet, sans temporaire"""
+        path = os.path.join(self.tmp, 'state.json')
+        payloads = [json.dumps({'writer': i, 'pad': 'x' * 100_000}) for i in range(8)]
+        threads = [
+            threading.Thread(target=InsiderScanner._write_file_atomic, args=(path, payload))
+            for payload in payloads
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with open(path) as f:
+            self.assertIn(f.read(), payloads)
+        self.assertEqual(os.listdir(self.tmp), ['state.json'])
+
+    def test_config_saves_are_debounced(self):
+        """Une rafale de set_config ne produit qu'une écriture, faite au flush"""
+        scanner = InsiderScanner()
+        scanner.set_config({'risky_bet': {'max_odds': 0.3}})
+        scanner.set_config({'risky_bet': {'min_amount': 75.0}})
+        self.assertFalse(os.path.exists(InsiderScanner.CONFIG_FILE))
+
+        scanner.flush_config()
+        with open(InsiderScanner.CONFIG_FILE) as f:
+            saved = json.load(f)
+
+        self.assertEqual(saved['risky_bet']['min_amount'], 75.0)
+        self.assertIsNone(scanner._save_timer)
+
+class TestProcessActivity(_IsolatedScannerTestCase):
+    def test_odds_follow_the_bought_token(self):
+        """La cote est celle du token acheté (champs Gamma en chaîne JSON), None si non résolu"""
+        market = {
+            'clobTokenIds': '["111", "222"]',
+            'outcomes': '["Yes", "No"]',
+            'outcomePrices': '["0.05", "0.95"]',
+        }
+        odds = lambda token: InsiderScanner._activity_odds({'asset': {'id': token}}, market)
+        self.assertEqual(odds('222'), (0.95, 'NO'))
+        self.assertEqual(odds('111'), (0.05, 'YES'))
+        self.assertEqual(odds('333'), (None, '?'))
+
+    def test_unresolved_odds_skip_low_odds_trigger(self):
+        """Sans cote résolue, seul le critère "High Stake" peut déclencher un RISKY_BET"""
+        scanner = InsiderScanner()
+        scanner._min_profile_amount = lambda: float('inf')
+        scanner.config['risky_bet'].update({'enabled': True, 'min_amount': 50, 'max_odds': 0.35, 'high_amount': 1000.0})
+        self.assertEqual(scanner.detect_triggers('0xaaa', 50, None), [])
+        self.assertEqual(len(scanner.detect_triggers('0xaaa', 50, 0.05)), 1)
+        self.assertEqual(len(scanner.detect_triggers('0xaaa', 1000, None)), 1)
+
+    def test_duplicate_skips_trigger_detection(self):
+        """Une activité déjà alertée s'arrête à la dedup, sans évaluer les triggers"""
+        scanner = InsiderScanner()
+        scanner.detect_triggers = MagicMock(return_value=[])
+        scanner.recent_alerts[scanner._generate_dedup_key('0xAAA', 'slug')] = time.monotonic()
+
+        activity = {'user': '0xAAA', 'amount': 50_000_000}
+        self.assertIsNone(scanner.process_activity(activity, {'slug': 'slug'}))
+        scanner.detect_triggers.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import json
+import time
+import threading
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hft_module.trade_monitor import HFTTradeMonitor
+
+class TestBatchedPositions(unittest.TestCase):
+    def setUp(self):
+        self.monitor = HFTTradeMonitor()
+        self.monitor._session = MagicMock()
+
+    def test_batch_splits_aliases_by_wallet(self):
+        """Une requête groupée est redistribuée par wallet, un alias manquant = échec"""
+        resp = MagicMock(status_code=200)
+        resp.content = json.dumps({'data': {
+            'w0': [{'balance': '2000000', 'asset': {'id': 'a1'}}],
+            'w1': [],
+        }}).encode()
+        self.monitor._session.post.return_value = resp
+
+        positions = self.monitor._get_positions_batch(['0xaaa', '0xbbb', '0xccc'])
+
+        self.assertEqual(self.monitor._session.post.call_count, 1)
+        self.assertEqual(positions['0xaaa'], {'a1': 2.0})
+        self.assertEqual(positions['0xbbb'], {})
+        self.assertNotIn('0xccc', positions)
+
+class TestAdaptivePolling(unittest.TestCase):
+    def test_backoff_when_quiet_and_reset_on_signal(self):
+        """L'intervalle double en période calme (plafonné) et revient au nominal sur signal"""
+        monitor = HFTTradeMonitor()
+        for _ in range(monitor.QUIET_POLLS_STEP):
+            monitor._update_poll_interval(False)
+        self.assertEqual(monitor._current_interval, monitor._poll_interval * 2)
+
+        for _ in range(100):
+            monitor._update_poll_interval(False)
+        self.assertEqual(monitor._current_interval, monitor.POLL_INTERVAL_MAX)
+
+        monitor._update_poll_interval(True)
+        self.assertEqual(monitor._current_interval, monitor._poll_interval)
+
+    def test_restart_keeps_a_single_poll_loop(self):
+        """stop() réveille la boucle en attente; start() attend sa fin avant d'en lancer une autre"""
+        monitor = HFTTradeMonitor()
+        monitor._current_interval = monitor.POLL_INTERVAL_MAX
+        monitor.start()
+        first_thread = monitor._poll_thread
+        time.sleep(0.1)  # La boucle est dans son attente de POLL_INTERVAL_MAX
+
+        monitor.stop()
+        monitor.start()
+        try:
+            self.assertFalse(first_thread.is_alive())
+            self.assertIsNot(monitor._poll_thread, first_thread)
+        finally:
+            monitor.stop()
+
+class TestMarketResult(unittest.TestCase):
+    def test_outcome_prices_parsing(self):
+        """outcomePrices est parsé en JSON, 0.5 par défaut si absent ou malformé"""
+        parse = lambda v: HFTTradeMonitor._market_result({'outcomePrices': v})['yes_price']
+        self.assertAlmostEqual(parse('["0.31","0.69"]'), 0.31)
+        self.assertEqual(parse('not json'), 0.5)
+        self.assertEqual(parse(None), 0.5)
+
+    def test_concurrent_misses_share_one_request(self):
+        """Des cache-miss concurrents sur le même token ne déclenchent qu'un appel Gamma"""
+        monitor = HFTTradeMonitor()
+        monitor._session = MagicMock()
+        resp = MagicMock(status_code=200, content=b'[{"question": "Q?", "outcomePrices": "[\\"0.4\\", \\"0.6\\"]"}]')
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.2)
+            return resp
+        monitor._session.get.side_effect = slow_get
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(monitor._get_market_info('tok'))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(monitor._session.get.call_count, 1)
+        self.assertEqual([r['yes_price'] for r in results], [0.4] * 4)
+
+if __name__ == '__main__':
+    unittest.main()